@@ -4,86 +4,151 @@ from flask_cors import CORS
 import os
 
 
-# Criar a aplicação Flask
-app = Flask(__name__)
-
-# Configurações
-app.config['SECRET_KEY'] = 'unyleya-gestao-cursos-2025'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///cursos.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB
-
-# Inicializar extensões
-db.init_app(app)
-CORS(app, origins="*")  # Permite acesso de qualquer origem
-
-# Criar pasta de uploads se não existir
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
-# Importar modelos (deve vir depois da criação do db)
-with app.app_context():
+def create_app(config=None):
+    """Cria e configura a aplicação Flask
+
+    Nada é escrito no banco aqui, para que cada worker inicie rápido. As
+    tabelas, migrações e dados iniciais ficam com o comando
+    `flask --app app inicializar-banco`, executado uma vez a cada deploy.
+
+    Qualquer configuração pode ser trocada por variáveis de ambiente com
+    prefixo FLASK_ (ex.: FLASK_PDF_WORKERS=4) ou pelo dicionário `config`.
+    """
+    # Criar a aplicação Flask
+    app = Flask(__name__)
+
+    # Configurações
+    app.config['SECRET_KEY'] = 'unyleya-gestao-cursos-2025'
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///cursos.db'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': 10,       # Conexões mantidas por processo (>= threads do worker)
+        'max_overflow': 5,     # Conexões extras em picos
+        'pool_timeout': 30,    # Segundos esperando uma conexão livre
+        'pool_pre_ping': True
+    }
+    app.config['SQLITE_PRAGMAS'] = {
+        'journal_mode': 'WAL',          # Leituras não esperam a escrita (e vice-versa)
+        'synchronous': 'NORMAL',        # Seguro com WAL e bem mais rápido que FULL
+        'busy_timeout': 15000,          # ms esperando escritores de outros processos
+        'mmap_size': 256 * 1024 * 1024, # Leituras via memória mapeada (256MB)
+        'cache_size': -64000            # Cache de páginas por conexão (~64MB)
+    }
+    app.config['UPLOAD_FOLDER'] = 'uploads'
+    app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB
+    app.config['IMPORTACAO_WORKERS'] = 1  # Threads para importações assíncronas
+    app.config['PDF_WORKERS'] = 2  # Processos para geração de PDF
+    app.config['PDF_CACHE_FOLDER'] = 'pdf_cache'
+    app.config['PDF_CACHE_MAX_BYTES'] = 200 * 1024 * 1024  # 200MB
+    app.config['COMPRESSAO_TAMANHO_MINIMO'] = 1024  # JSON menor que isso não é comprimido
+    app.config['METRICAS_ATIVAS'] = False  # Expõe /api/metrics (formato Prometheus)
+    app.config['CATALOGO_EM_MEMORIA'] = False  # Listagem e opções servidas da memória (src/catalogo.py)
+    app.config['EXPURGO_AUTOMATICO'] = False  # Thread diária de expurgo (ver src/expurgo.py)
+    app.config['EXPURGO_HORARIO'] = (2, 5)  # Janela do expurgo (hora inicial, hora final)
+    app.config['EXPURGO_RETENCAO_DIAS'] = 30  # Cursos excluídos há mais tempo são removidos
+    app.config['EXPURGO_TAMANHO_LOTE'] = 500  # Cursos removidos por transação
+    app.config['EXPURGO_PAUSA_SEGUNDOS'] = 0.5  # Pausa entre lotes
+    app.config['EXPURGO_FRACAO_VACUUM'] = 0.2  # Páginas livres que justificam um VACUUM
+
+    # Configurações do ambiente e da chamada têm precedência
+    app.config.from_prefixed_env()
+    if config:
+        app.config.update(config)
+
+    # Inicializar extensões
+    db.init_app(app)
+    with app.app_context():
+        from src.banco import configurar_sqlite
+        configurar_sqlite(db.engine, app.config['SQLITE_PRAGMAS'])
+
+        # Latência por endpoint, SQL, PDFs e planilhas (se METRICAS_ATIVAS)
+        from src.metricas import configurar_metricas
+        configurar_metricas(app, db.engine)
+    CORS(app, origins="*")  # Permite acesso de qualquer origem
+
+    # Criar pastas de uploads e do cache de PDFs se não existirem
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['PDF_CACHE_FOLDER'], exist_ok=True)
+
+    # Importar modelos (deve vir depois da criação do db)
     from src.curso import Curso
+    from src.versao_dados import VersaoDados
+    from src.importacao_jobs import ImportacaoJob
+    from src.exportacao_pdf import ExportacaoPdf
     from src.curso_routes import curso_bp
-    
+    from src.cache_respostas import responder_com_cache
+    from src.serializacao import consultar_colunas, linhas_para_dicts, resposta_json
+
     # Registrar blueprints
     app.register_blueprint(curso_bp, url_prefix='/api')
-    
-    # Criar tabelas
-    db.create_all()
-    
-    # Popular com dados iniciais
-    from src.populate_db import criar_cursos_iniciais
-    criar_cursos_iniciais()
-
-# Rota para servir o frontend
-@app.route('/')
-def index():
-    """Serve a página principal"""
-    return send_from_directory('../frontend', 'index.html')
-
-@app.route('/<path:path>')
-def static_files(path):
-    """Serve arquivos estáticos do frontend"""
-    try:
-        return send_from_directory('../frontend', path)
-    except:
-        # Se arquivo não encontrado, retornar 404
-        return "Arquivo não encontrado", 404
-
-# Rota de status para verificar se API está funcionando
-@app.route('/api/status')
-def status():
-    """Verifica status da API"""
-    return jsonify({
-        'status': 'online',
-        'message': 'API do Sistema de Gestão de Cursos está funcionando',
-        'version': '1.0'
-    })
-
-
-
 
-# Adicione este código para debug no app.py
-@app.route('/api/debug/cursos')
-def debug_cursos():
-    cursos = Curso.query.all()
-    return jsonify([curso.to_dict() for curso in cursos])
+    # Comandos de linha (inicializar-banco, retomar-importacoes, expurgar-cursos)
+    from src.comandos import registrar_comandos
+    registrar_comandos(app)
+
+    # Remoção física dos cursos excluídos, fora do horário de pico
+    if app.config['EXPURGO_AUTOMATICO']:
+        from src.expurgo import iniciar_expurgo_periodico
+        iniciar_expurgo_periodico(app)
+
+    # Comprimir respostas JSON grandes (gzip ou brotli, conforme o cliente)
+    from src.compressao import comprimir_resposta
+    app.after_request(comprimir_resposta)
+
+    # Arquivos do frontend com hash no nome e versões pré-comprimidas
+    from src.arquivos_estaticos import preparar_arquivos_estaticos
+    preparar_arquivos_estaticos(app)
+
+    # Rota para servir o frontend
+    @app.route('/')
+    def index():
+        """Serve a página principal"""
+        return render_template('index.html')
+
+    @app.route('/<path:path>')
+    def static_files(path):
+        """Serve arquivos estáticos do frontend"""
+        try:
+            return send_from_directory('../frontend', path)
+        except:
+            # Se arquivo não encontrado, retornar 404
+            return "Arquivo não encontrado", 404
+
+    # Rota de status para verificar se API está funcionando
+    @app.route('/api/status')
+    def status():
+        """Verifica status da API"""
+        return jsonify({
+            'status': 'online',
+            'message': 'API do Sistema de Gestão de Cursos está funcionando',
+            'version': '1.0'
+        })
+
+    # Adicione este código para debug no app.py
+    @app.route('/api/debug/cursos')
+    def debug_cursos():
+        def montar_resposta():
+            linhas = consultar_colunas().order_by(Curso.id)
+            return resposta_json(linhas_para_dicts(linhas))
+
+        return responder_com_cache('debug-cursos', montar_resposta)
+
+    # Tratamento de erros
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({'error': 'Endpoint não encontrado'}), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+    return app
 
 
-# Tratamento de erros
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({'error': 'Endpoint não encontrado'}), 404
-
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({'error': 'Erro interno do servidor'}), 500
-
 # Adicione este código ao app.py para mostrar o IP automaticamente
-import socket
-
 def obter_ip_local():
+    import socket
+
     try:
         # Conectar a um endereço externo para descobrir IP local
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -94,8 +159,17 @@ def obter_ip_local():
     except:
         return "localhost"
 
-# Usar na função main:
+# Servidor de desenvolvimento (em produção use: gunicorn -c gunicorn.conf.py)
 if __name__ == '__main__':
+    app = create_app()
+
+    # Um único processo: pode preparar o banco e retomar importações aqui
+    from src.comandos import inicializar_banco
+    from src.importacao_jobs import retomar_jobs_pendentes
+    with app.app_context():
+        inicializar_banco()
+        retomar_jobs_pendentes(app)
+
     ip_local = obter_ip_local()
     print("🚀 Iniciando Sistema de Gestão de Cursos - Unyleya")
     print(f"📍 Acesso local: http://localhost:5000")
@@ -103,13 +177,10 @@ if __name__ == '__main__':
     print(f"📊 API Status: http://{ip_local}:5000/api/status")
     print("⏹️  Para parar: Ctrl+C")
     print("-" * 50)
-    
+
     app.run(
         debug=True,           # Modo desenvolvimento
         host='0.0.0.0',      # Permite acesso de outros dispositivos
         port=5000,           # Porta padrão
         threaded=True        # Suporte a múltiplas requisições
     )
-
-
-
@@ -0,0 +1 @@
+"""Benchmarks do Sistema de Gestão de Cursos"""
@@ -0,0 +1,51 @@
+"""Mede bytes transferidos e latência das respostas com e sem compressão
+
+Usa o banco configurado em create_app() e o cliente de testes do Flask.
+
+Uso: python -m benchmarks.bench_compressao [repetições]
+"""
+import re
+import statistics
+import sys
+import time
+
+from app import create_app
+from src.cache_respostas import cache_respostas
+from src.compressao import codificacoes_disponiveis
+
+
+# Repetições de cada medição quando nenhuma quantidade é informada
+REPETICOES_PADRAO = 20
+
+
+def medir(cliente, url, codificacao, repeticoes, limpar_cache):
+    """Retorna (bytes da resposta, mediana da latência em ms)"""
+    cabecalhos = {'Accept-Encoding': codificacao or 'identity'}
+    tempos = []
+    tamanho = 0
+    for _ in range(repeticoes):
+        if limpar_cache:
+            cache_respostas.limpar()
+        inicio = time.perf_counter()
+        resposta = cliente.get(url, headers=cabecalhos)
+        tempos.append(time.perf_counter() - inicio)
+        tamanho = len(resposta.data)
+    return tamanho, statistics.median(tempos) * 1000
+
+
+def main(repeticoes):
+    cliente = create_app().test_client()
+    pagina = cliente.get('/').get_data(as_text=True)
+    urls = ['/api/cursos', '/api/cursos?limit=100'] + re.findall(r'/assets/[^"]+', pagina)
+    codificacoes = [None] + list(codificacoes_disponiveis())
+
+    print(f"{'url':<40} {'codificação':>11} {'bytes':>9} {'frio (ms)':>10} {'cache (ms)':>11}")
+    for url in urls:
+        for codificacao in codificacoes:
+            tamanho, frio = medir(cliente, url, codificacao, repeticoes, limpar_cache=True)
+            _, quente = medir(cliente, url, codificacao, repeticoes, limpar_cache=False)
+            print(f"{url:<40} {codificacao or 'nenhuma':>11} {tamanho:>9} {frio:>10.2f} {quente:>11.2f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REPETICOES_PADRAO)
@@ -0,0 +1,117 @@
+"""Leituras e escritas concorrentes durante uma importação grande
+
+Cria um banco temporário, envia uma planilha de 100 mil linhas pela
+importação assíncrona e, enquanto ela roda, dispara leituras (listagem e
+opções) e cadastros em paralelo. Ao final mostra quantas requisições
+falharam (ex.: "database is locked") e a latência das leituras.
+
+Uso: python -m benchmarks.bench_concorrencia [linhas] [threads_leitura]
+"""
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from app import create_app
+from benchmarks.dados import gerar_planilha
+from src.comandos import inicializar_banco
+
+
+# Valores usados quando não informados na linha de comando
+LINHAS_PADRAO = 100_000
+THREADS_LEITURA_PADRAO = 4
+
+
+def ler_em_laco(cliente, parar, latencias, falhas):
+    """Faz leituras até a importação terminar"""
+    urls = ['/api/cursos?limit=50', '/api/cursos?limit=50&area=Direito',
+            '/api/cursos/opcoes']
+    numero = 0
+    while not parar.is_set():
+        url = urls[numero % len(urls)]
+        numero += 1
+        inicio = time.perf_counter()
+        resposta = cliente.get(url)
+        latencias.append(time.perf_counter() - inicio)
+        if resposta.status_code != 200:
+            falhas.append(f'GET {url}: {resposta.status_code} {resposta.get_data(as_text=True)[:200]}')
+
+
+def escrever_em_laco(cliente, parar, falhas, contador):
+    """Cadastra cursos até a importação terminar"""
+    numero = 0
+    while not parar.is_set():
+        numero += 1
+        resposta = cliente.post('/api/cursos', json={
+            'nome': f'Curso Concorrente {threading.get_ident()}-{numero}',
+            'area': 'Direito', 'metodologia': 'SV40', 'faixa': 'FAIXA 1'
+        })
+        contador.append(1)
+        if resposta.status_code != 201:
+            falhas.append(f'POST /api/cursos: {resposta.status_code} '
+                          f'{resposta.get_data(as_text=True)[:200]}')
+        time.sleep(0.05)
+
+
+def main(linhas, threads_leitura):
+    pasta = tempfile.mkdtemp(prefix='bench_concorrencia_')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(pasta, 'cursos.db')}",
+        'UPLOAD_FOLDER': os.path.join(pasta, 'uploads'),
+        'PDF_CACHE_FOLDER': os.path.join(pasta, 'pdf_cache')
+    })
+    with app.app_context():
+        inicializar_banco()
+
+    print(f'Gerando planilha com {linhas} linhas...')
+    planilha = gerar_planilha(linhas, io.BytesIO())
+    planilha.seek(0)
+
+    cliente = app.test_client()
+    resposta = cliente.post('/api/cursos/upload?assincrono=1', data={
+        'arquivo': (planilha, 'cursos.xlsx')
+    }, content_type='multipart/form-data')
+    job_id = resposta.get_json()['job_id']
+
+    parar = threading.Event()
+    latencias, falhas, escritas = [], [], []
+    threads = [threading.Thread(target=ler_em_laco,
+                                args=(app.test_client(), parar, latencias, falhas))
+               for _ in range(threads_leitura)]
+    threads.append(threading.Thread(target=escrever_em_laco,
+                                    args=(app.test_client(), parar, falhas, escritas)))
+
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    while True:
+        job = cliente.get(f'/api/cursos/upload/{job_id}').get_json()['job']
+        if job['status'] in ('concluido', 'erro'):
+            break
+        time.sleep(0.2)
+    duracao = time.perf_counter() - inicio
+
+    parar.set()
+    for thread in threads:
+        thread.join()
+
+    latencias.sort()
+    print(f"Importação: {job['status']}, {job['cursos_adicionados']} cursos em {duracao:.1f}s")
+    print(f'Leituras: {len(latencias)} ({len(latencias) / duracao:.0f}/s), '
+          f'p50 {statistics.median(latencias) * 1000:.1f}ms, '
+          f'p99 {latencias[int(len(latencias) * 0.99)] * 1000:.1f}ms')
+    print(f'Cadastros concorrentes: {len(escritas)}')
+    print(f'Falhas: {len(falhas)}')
+    for falha in falhas[:10]:
+        print(f'  {falha}')
+
+    return 1 if falhas or job['status'] != 'concluido' else 0
+
+
+if __name__ == '__main__':
+    argumentos = [int(valor) for valor in sys.argv[1:]]
+    sys.exit(main(*(argumentos + [LINHAS_PADRAO, THREADS_LEITURA_PADRAO][len(argumentos):])))
@@ -0,0 +1,95 @@
+"""Orçamento de tempo de inicialização de um worker só de API
+
+Cada medição roda em um processo Python novo (importação a frio): mede a
+importação de app.py, o create_app() e a primeira requisição à
+listagem, e verifica que ReportLab e openpyxl não foram carregados, já
+que só as rotas de exportação e upload precisam deles. Sai com código 1
+se a mediana de alguma etapa passar do orçamento.
+
+Usa o banco configurado da aplicação (instance/cursos.db, ou
+FLASK_SQLALCHEMY_DATABASE_URI), que precisa estar inicializado.
+
+Uso: python -m benchmarks.bench_inicializacao [repeticoes]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+REPETICOES_PADRAO = 5
+
+# Orçamento (ms) da mediana de cada etapa
+ORCAMENTO_MS = {
+    'importacao': 1000,
+    'create_app': 300,
+    'primeira_requisicao': 250,
+}
+
+# Módulos que um worker só de API não deve carregar
+MODULOS_PESADOS = ('reportlab', 'openpyxl')
+
+# Executado em um processo novo; imprime as medições em JSON
+CODIGO_MEDICAO = """
+import json, sys, time
+
+inicio = time.perf_counter()
+import app
+importacao = time.perf_counter() - inicio
+
+inicio = time.perf_counter()
+aplicacao = app.create_app()
+criacao = time.perf_counter() - inicio
+
+inicio = time.perf_counter()
+resposta = aplicacao.test_client().get('/api/cursos?limit=50')
+primeira_requisicao = time.perf_counter() - inicio
+
+print(json.dumps({
+    'status': resposta.status_code,
+    'importacao': importacao * 1000,
+    'create_app': criacao * 1000,
+    'primeira_requisicao': primeira_requisicao * 1000,
+    'modulos': sorted({nome.split('.')[0] for nome in sys.modules}),
+}))
+"""
+
+
+def medir_uma_vez():
+    """Inicia um processo novo e retorna as medições dele"""
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ambiente = dict(os.environ, PYTHONPATH=raiz)
+    saida = subprocess.run([sys.executable, '-c', CODIGO_MEDICAO], cwd=raiz, env=ambiente,
+                           capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main(repeticoes):
+    medicoes = [medir_uma_vez() for _ in range(repeticoes)]
+
+    falhas = []
+    if any(medicao['status'] != 200 for medicao in medicoes):
+        falhas.append('a primeira requisição não retornou 200 (banco inicializado?)')
+
+    for etapa, orcamento in ORCAMENTO_MS.items():
+        valores = [medicao[etapa] for medicao in medicoes]
+        mediana = statistics.median(valores)
+        situacao = 'OK' if mediana <= orcamento else 'ACIMA'
+        print(f'{etapa:<20} mediana {mediana:7.1f}ms  máx {max(valores):7.1f}ms  '
+              f'(orçamento {orcamento}ms) {situacao}')
+        if mediana > orcamento:
+            falhas.append(f'{etapa} acima do orçamento')
+
+    carregados = set(MODULOS_PESADOS) & set(medicoes[0]['modulos'])
+    print(f"Módulos pesados carregados: {', '.join(sorted(carregados)) or 'nenhum'}")
+    if carregados:
+        falhas.append('módulos pesados importados na inicialização')
+
+    for falha in falhas:
+        print(f'  {falha}')
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else REPETICOES_PADRAO))
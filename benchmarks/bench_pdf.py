@@ -0,0 +1,33 @@
+"""Mede o tempo de geração dos PDFs em função da quantidade de cursos
+
+Uso: python -m benchmarks.bench_pdf [quantidades...]
+"""
+import sys
+import time
+
+from benchmarks.dados import gerar_cursos
+from src.pdf_generator import criar_pdf_design1, criar_pdf_design2
+
+
+# Quantidades de cursos medidas quando nenhuma é informada
+QUANTIDADES_PADRAO = [100, 500, 1000, 2000]
+
+
+def medir(funcao, cursos):
+    """Retorna o tempo (s) e o tamanho (bytes) de uma geração de PDF"""
+    inicio = time.perf_counter()
+    buffer = funcao(cursos)
+    return time.perf_counter() - inicio, buffer.getbuffer().nbytes
+
+
+def main(quantidades):
+    print(f"{'cursos':>8} {'design1 (s)':>12} {'design2 (s)':>12} {'tamanho1 (KB)':>14}")
+    for quantidade in quantidades:
+        cursos = gerar_cursos(quantidade)
+        tempo1, tamanho1 = medir(criar_pdf_design1, cursos)
+        tempo2, _ = medir(criar_pdf_design2, cursos)
+        print(f"{quantidade:>8} {tempo1:>12.3f} {tempo2:>12.3f} {tamanho1 / 1024:>14.1f}")
+
+
+if __name__ == '__main__':
+    main([int(valor) for valor in sys.argv[1:]] or QUANTIDADES_PADRAO)
@@ -0,0 +1,89 @@
+"""Dados sintéticos e determinísticos usados pelos benchmarks
+
+O mesmo índice gera sempre o mesmo curso, então bancos e planilhas do
+mesmo tamanho são idênticos entre execuções.
+"""
+import os
+from datetime import datetime, timedelta
+
+import openpyxl
+
+from src.curso import Curso
+from src.extensions import db
+from src.migracoes import aplicar_migracoes
+from src.versao_dados import incrementar_versao
+
+
+AREAS = ('Direito', 'Educação', 'Saúde', 'Gestão', 'Engenharia', 'Tecnologia',
+         'Psicologia', 'Finanças', 'Marketing', 'Comunicação', 'Meio Ambiente', '')
+METODOLOGIAS = ('SV40', 'SV100', 'CV100')
+PALAVRAS = ('Gestão', 'Pública', 'Tributário', 'Educacional', 'Hospitalar', 'Digital',
+            'Ambiental', 'Financeira', 'Processual', 'Clínica', 'Estratégica', 'Escolar',
+            'Empresarial', 'Social', 'Jurídica', 'Dados', 'Projetos')
+
+# Início das datas de criação (uma por minuto a partir daqui)
+DATA_INICIAL = datetime(2024, 1, 1)
+
+# Cursos inseridos por comando ao popular um banco
+TAMANHO_LOTE_BANCO = 10_000
+
+
+def gerar_curso(i):
+    """Gera o curso de índice `i` (a partir de 1) no formato de Curso.to_dict()"""
+    metodologia = METODOLOGIAS[i % len(METODOLOGIAS)]
+    return {
+        'id': i,
+        'nome': (f'{metodologia} - {PALAVRAS[i % len(PALAVRAS)]} '
+                 f'{PALAVRAS[(i // len(PALAVRAS)) % len(PALAVRAS)]} {i}'),
+        'area': AREAS[i % len(AREAS)] or None,
+        'metodologia': metodologia,
+        'faixa': f'FAIXA {i % 4 + 1}',
+        'data_criacao': DATA_INICIAL + timedelta(minutes=i),
+        # Um em cada vinte cursos fica inativo
+        'ativo': i % 20 != 0,
+    }
+
+
+def gerar_cursos(quantidade):
+    """Gera uma lista de cursos sintéticos"""
+    return [gerar_curso(i) for i in range(1, quantidade + 1)]
+
+
+def gerar_planilha(linhas, destino, inicio=1):
+    """Grava uma planilha de importação com `linhas` cursos em `destino`
+
+    `destino` pode ser um caminho ou um arquivo aberto (ex.: BytesIO).
+    Com `inicio` acima do tamanho do banco, todos os cursos são novos.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(['Curso', 'Área', 'Metodologia', 'Faixa'])
+    for i in range(inicio, inicio + linhas):
+        curso = gerar_curso(i)
+        sheet.append([curso['nome'], curso['area'], curso['metodologia'], curso['faixa']])
+    workbook.save(destino)
+    return destino
+
+
+def popular_banco(linhas):
+    """Cria o esquema e insere `linhas` cursos sintéticos no banco da aplicação
+
+    Deve rodar dentro do contexto da aplicação, com o banco vazio. As
+    migrações (incluindo a reconstrução do índice de busca) rodam depois
+    da carga, o que é bem mais rápido que manter o FTS a cada inserção.
+    """
+    db.create_all()
+    tabela = Curso.__table__
+
+    for inicio in range(1, linhas + 1, TAMANHO_LOTE_BANCO):
+        fim = min(inicio + TAMANHO_LOTE_BANCO, linhas + 1)
+        db.session.execute(tabela.insert(), [gerar_curso(i) for i in range(inicio, fim)])
+    incrementar_versao()
+    db.session.commit()
+
+    aplicar_migracoes()
+
+
+def caminho_banco_semeado(pasta, linhas):
+    """Retorna o caminho do banco sintético de `linhas` cursos na pasta"""
+    return os.path.join(os.path.abspath(pasta), f'cursos_{linhas}.db')
@@ -0,0 +1,334 @@
+"""Suíte de benchmarks da API de cursos
+
+Para cada tamanho de banco (por padrão 1 mil, 100 mil e 1 milhão de
+cursos) popula um banco sintético, que fica guardado na pasta de dados
+para as próximas execuções, e mede cada cenário pelo cliente de testes do
+Flask. Os caches em memória e de PDFs são limpos antes de cada requisição,
+para medir o trabalho real.
+
+Cada cenário roda em um processo separado, então o pico de memória (RSS)
+informado é só o dele (rss_inicial_kb é o do processo antes da primeira
+requisição). Nos cenários de PDF, o pico dos processos do ReportLab vem à
+parte, em rss_pico_filhos_kb. O resultado é gravado em JSON com chaves
+ordenadas, para ser comparado entre execuções:
+
+Uso:
+    python -m benchmarks.suite [--tamanhos 1000 100000] [--saida resultado.json]
+    python -m benchmarks.suite --comparar antes.json depois.json
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from app import create_app
+from benchmarks.dados import caminho_banco_semeado, gerar_planilha, popular_banco
+from src import exportacao_pdf
+from src.cache_respostas import cache_respostas
+from src.curso_routes import cache_opcoes, trava_cache_opcoes
+from src.extensions import db
+from src.migracoes import aplicar_migracoes
+
+
+TAMANHOS_PADRAO = [1_000, 100_000, 1_000_000]
+LINHAS_PLANILHA_PADRAO = 10_000
+REPETICOES_PADRAO = 20
+REPETICOES_PESADAS_PADRAO = 3
+
+# Acima disso a listagem completa (sem limit) não é medida
+LIMITE_LISTAGEM_COMPLETA = 100_000
+
+# Cursos exportados nos cenários de PDF (mesma quantidade em todos os tamanhos)
+CURSOS_POR_PDF = 1_000
+
+# Nome -> (método, URL, pesado); o corpo dos POSTs é montado em montar_requisicao
+CENARIOS = {
+    'listar_pagina': ('GET', '/api/cursos?limit=50', False),
+    'listar_pagina_cursor': ('GET', '/api/cursos?limit=50&after=500', False),
+    'listar_filtro_area': ('GET', '/api/cursos?limit=50&area=Direito&total=1', False),
+    'listar_busca': ('GET', '/api/cursos?limit=50&busca=gest%C3%A3o%20p%C3%BAblica', False),
+    'listar_campos': ('GET', '/api/cursos?limit=500&fields=nome,area', False),
+    'listar_completo': ('GET', '/api/cursos', True),
+    'opcoes': ('GET', '/api/cursos/opcoes', False),
+    'exportar_csv_area': ('GET', '/api/cursos/export/csv?area=Direito', True),
+    'importar_planilha_dry_run': ('POST', '/api/cursos/upload?dry_run=1', True),
+    'pdf_design1': ('POST', '/api/cursos/export/pdf', True),
+    'pdf_design2': ('POST', '/api/cursos/export/pdf', True),
+}
+
+
+def pico_rss_kb(quem=resource.RUSAGE_SELF):
+    """Pico de memória residente deste processo (ou do maior filho já encerrado), em KB"""
+    pico = resource.getrusage(quem).ru_maxrss
+    # No macOS o valor vem em bytes
+    return pico // 1024 if sys.platform == 'darwin' else pico
+
+
+def percentil(valores_ordenados, fracao):
+    """Percentil pelo método do posto mais próximo"""
+    indice = max(0, min(len(valores_ordenados) - 1,
+                        int(round(fracao * len(valores_ordenados))) - 1))
+    return valores_ordenados[indice]
+
+
+def limpar_caches(app):
+    """Esvazia os caches de respostas, de opções e de PDFs"""
+    cache_respostas.limpar()
+    with trava_cache_opcoes:
+        cache_opcoes['versao'] = None
+
+    pasta_pdf = app.config['PDF_CACHE_FOLDER']
+    for nome in os.listdir(pasta_pdf):
+        os.remove(os.path.join(pasta_pdf, nome))
+
+
+def montar_requisicao(nome, planilha):
+    """Retorna os argumentos extras do cliente de testes para o cenário"""
+    if nome == 'importar_planilha_dry_run':
+        return {'data': {'arquivo': (io.BytesIO(planilha), 'cursos.xlsx')},
+                'content_type': 'multipart/form-data'}
+    if nome.startswith('pdf_'):
+        return {'json': {'curso_ids': list(range(1, CURSOS_POR_PDF + 1)),
+                         'design': nome.split('_', 1)[1],
+                         'titulo': 'Benchmark'}}
+    return {}
+
+
+def medir_cenario(app, cliente, nome, repeticoes, planilha):
+    """Executa o cenário `repeticoes` vezes e resume as latências"""
+    metodo, url, _ = CENARIOS[nome]
+    latencias = []
+    bytes_resposta = 0
+
+    for _ in range(repeticoes):
+        limpar_caches(app)
+        argumentos = montar_requisicao(nome, planilha)
+        inicio = time.perf_counter()
+        resposta = cliente.open(url, method=metodo, **argumentos)
+        corpo = resposta.data
+        latencias.append(time.perf_counter() - inicio)
+
+        if resposta.status_code != 200:
+            raise RuntimeError(f'{nome}: status {resposta.status_code} - {corpo[:200]!r}')
+        bytes_resposta = len(corpo)
+
+    latencias.sort()
+    return {
+        'repeticoes': repeticoes,
+        'vazao_rps': round(repeticoes / sum(latencias), 2),
+        'p50_ms': round(percentil(latencias, 0.50) * 1000, 3),
+        'p99_ms': round(percentil(latencias, 0.99) * 1000, 3),
+        'bytes_resposta': bytes_resposta,
+    }
+
+
+def criar_app_benchmark(caminho, pasta_temporaria):
+    """Aplicação com o banco sintético e pastas de upload e de PDFs temporárias"""
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}',
+        'UPLOAD_FOLDER': os.path.join(pasta_temporaria, 'uploads'),
+        'PDF_CACHE_FOLDER': os.path.join(pasta_temporaria, 'pdf_cache'),
+    })
+
+
+def preparar_banco(tamanho, pasta_dados):
+    """Popula o banco sintético, se ainda não existir, e retorna o tempo gasto
+
+    Um banco já semeado só recebe as migrações (colunas e índices novos).
+    """
+    caminho = caminho_banco_semeado(pasta_dados, tamanho)
+    pasta_temporaria = tempfile.mkdtemp(prefix='bench_suite_')
+
+    if os.path.exists(caminho):
+        try:
+            with criar_app_benchmark(caminho, pasta_temporaria).app_context():
+                aplicar_migracoes()
+                db.engine.dispose()
+        finally:
+            shutil.rmtree(pasta_temporaria, ignore_errors=True)
+        return None
+
+    inicio = time.perf_counter()
+    try:
+        app = criar_app_benchmark(caminho, pasta_temporaria)
+        with app.app_context():
+            popular_banco(tamanho)
+            db.engine.dispose()
+    except BaseException:
+        # Não deixar um banco pela metade para as próximas execuções
+        for sufixo in ('', '-wal', '-shm'):
+            if os.path.exists(caminho + sufixo):
+                os.remove(caminho + sufixo)
+        raise
+    finally:
+        shutil.rmtree(pasta_temporaria, ignore_errors=True)
+    return round(time.perf_counter() - inicio, 2)
+
+
+def medir_cenario_isolado(nome, tamanho, pasta_dados, linhas_planilha, repeticoes):
+    """Mede um cenário com um banco de `tamanho` cursos
+
+    Roda em um processo próprio (ver executar_em_processo), para que o
+    pico de memória seja só o do cenário.
+    """
+    pasta_temporaria = tempfile.mkdtemp(prefix='bench_suite_')
+    app = criar_app_benchmark(caminho_banco_semeado(pasta_dados, tamanho), pasta_temporaria)
+
+    try:
+        planilha = None
+        if nome == 'importar_planilha_dry_run':
+            # Cursos novos (ids acima do tamanho do banco), para medir a importação inteira
+            planilha = gerar_planilha(linhas_planilha, io.BytesIO(), inicio=tamanho + 1).getvalue()
+
+        rss_inicial = pico_rss_kb()
+        resultado = medir_cenario(app, app.test_client(), nome, repeticoes, planilha)
+        resultado['rss_inicial_kb'] = rss_inicial
+        resultado['rss_pico_kb'] = pico_rss_kb()
+    finally:
+        # Encerra (e aguarda) os processos do pool de PDFs: só então o pico
+        # deles entra em RUSAGE_CHILDREN, e este processo pode terminar
+        if exportacao_pdf.executor is not None:
+            exportacao_pdf.executor.shutdown()
+        shutil.rmtree(pasta_temporaria, ignore_errors=True)
+
+    if nome.startswith('pdf_'):
+        resultado['rss_pico_filhos_kb'] = pico_rss_kb(resource.RUSAGE_CHILDREN)
+    return resultado
+
+
+def executar_e_devolver(fila, funcao, *argumentos):
+    """Alvo dos processos da suíte: devolve o resultado (ou o erro) pela fila"""
+    try:
+        fila.put(('ok', funcao(*argumentos)))
+    except Exception as e:
+        fila.put(('erro', f'{type(e).__name__}: {e}'))
+
+
+def executar_em_processo(funcao, *argumentos):
+    """Executa a função em um processo novo e retorna o resultado
+
+    Processos comuns (não os daemônicos de um Pool), pois a exportação de
+    PDF cria o próprio pool de processos.
+    """
+    contexto = multiprocessing.get_context('spawn')
+    fila = contexto.Queue()
+    processo = contexto.Process(target=executar_e_devolver, args=(fila, funcao, *argumentos))
+    processo.start()
+    situacao, resultado = fila.get()
+    processo.join()
+    if situacao == 'erro':
+        raise RuntimeError(resultado)
+    return resultado
+
+
+def medir_tamanho(tamanho, pasta_dados, linhas_planilha, repeticoes, repeticoes_pesadas):
+    """Mede todos os cenários com um banco de `tamanho` cursos, cada um em um processo"""
+    segundos_carga = executar_em_processo(preparar_banco, tamanho, pasta_dados)
+
+    resultados = {}
+    for nome, (_, _, pesado) in CENARIOS.items():
+        if nome == 'listar_completo' and tamanho > LIMITE_LISTAGEM_COMPLETA:
+            continue
+        print(f'  {tamanho} cursos: {nome}', file=sys.stderr)
+        resultados[nome] = executar_em_processo(
+            medir_cenario_isolado, nome, tamanho, pasta_dados, linhas_planilha,
+            repeticoes_pesadas if pesado else repeticoes
+        )
+
+    return {'segundos_carga_banco': segundos_carga, 'cenarios': resultados}
+
+
+def versao_do_codigo():
+    """Commit atual do git (ou None fora de um repositório)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(antes, depois):
+    """Mostra a variação percentual de cada métrica entre dois resultados"""
+    with open(antes, encoding='utf-8') as arquivo:
+        anterior = json.load(arquivo)['resultados']
+    with open(depois, encoding='utf-8') as arquivo:
+        atual = json.load(arquivo)['resultados']
+
+    metricas = ('vazao_rps', 'p50_ms', 'p99_ms', 'rss_pico_kb', 'rss_pico_filhos_kb')
+    print(f"{'tamanho':>9} {'cenário':<28}" + ''.join(f'{m:>20}' for m in metricas))
+    for tamanho in sorted(set(anterior) & set(atual), key=int):
+        cenarios = anterior[tamanho]['cenarios']
+        for nome in sorted(set(cenarios) & set(atual[tamanho]['cenarios'])):
+            colunas = []
+            for metrica in metricas:
+                valor_antes = cenarios[nome].get(metrica)
+                valor_depois = atual[tamanho]['cenarios'][nome].get(metrica)
+                if valor_antes is None or valor_depois is None:
+                    colunas.append(f'{"-":>20}')
+                    continue
+                variacao = (valor_depois - valor_antes) / valor_antes * 100 if valor_antes else 0
+                colunas.append(f'{variacao:>+19.1f}%')
+            print(f'{tamanho:>9} {nome:<28}' + ''.join(colunas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks da API de cursos')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help='quantidades de cursos nos bancos sintéticos')
+    parser.add_argument('--linhas-planilha', type=int, default=LINHAS_PLANILHA_PADRAO,
+                        help='linhas da planilha usada na importação')
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES_PADRAO,
+                        help='repetições dos cenários leves')
+    parser.add_argument('--repeticoes-pesadas', type=int, default=REPETICOES_PESADAS_PADRAO,
+                        help='repetições dos cenários pesados (PDF, planilha, exportação)')
+    parser.add_argument('--dados', default=os.path.join(tempfile.gettempdir(), 'uny_sgc_bench'),
+                        help='pasta onde os bancos sintéticos são guardados')
+    parser.add_argument('--saida', default='benchmark.json', help='arquivo JSON do resultado')
+    parser.add_argument('--comparar', nargs=2, metavar=('ANTES', 'DEPOIS'),
+                        help='compara dois resultados em vez de medir')
+    argumentos = parser.parse_args()
+
+    if argumentos.comparar:
+        comparar(*argumentos.comparar)
+        return
+
+    os.makedirs(argumentos.dados, exist_ok=True)
+    resultados = {}
+    for tamanho in argumentos.tamanhos:
+        try:
+            resultados[str(tamanho)] = medir_tamanho(
+                tamanho, argumentos.dados, argumentos.linhas_planilha,
+                argumentos.repeticoes, argumentos.repeticoes_pesadas
+            )
+        except RuntimeError as e:
+            sys.exit(f'Falha com {tamanho} cursos: {e}')
+
+    relatorio = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': versao_do_codigo(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {
+            'linhas_planilha': argumentos.linhas_planilha,
+            'repeticoes': argumentos.repeticoes,
+            'repeticoes_pesadas': argumentos.repeticoes_pesadas,
+            'cursos_por_pdf': CURSOS_POR_PDF,
+        },
+        'resultados': resultados,
+    }
+    with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, sort_keys=True, ensure_ascii=False)
+    print(f'Resultado gravado em {argumentos.saida}')
+
+
+if __name__ == '__main__':
+    main()
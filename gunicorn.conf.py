@@ -0,0 +1,31 @@
+"""Configuração do Gunicorn
+
+Todos os valores podem ser trocados por variáveis de ambiente, por exemplo:
+    GUNICORN_WORKERS=4 GUNICORN_THREADS=8 gunicorn -c gunicorn.conf.py
+
+Lembre de manter o pool do banco (FLASK_SQLALCHEMY_ENGINE_OPTIONS) com
+pelo menos uma conexão por thread.
+"""
+import multiprocessing
+import os
+
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Processos e threads por processo
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# Uploads grandes e PDFs síncronos podem levar mais que o padrão de 30s
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclar workers periodicamente evita crescimento de memória
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = 100
+
+accesslog = '-'
+errorlog = '-'
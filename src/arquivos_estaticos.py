@@ -0,0 +1,78 @@
+import hashlib
+import mimetypes
+import os
+
+from flask import abort, current_app, request, url_for
+
+from src.compressao import (
+    codificacoes_disponiveis, comprimir, escolher_codificacao, sufixar_etag
+)
+
+
+# Arquivos do frontend servidos com hash no nome e versões pré-comprimidas
+ARQUIVOS_VERSIONADOS = ('js/main.js', 'css/style.css')
+
+# O nome muda junto com o conteúdo, então o navegador pode guardá-lo para sempre
+CACHE_CONTROL_VERSIONADOS = 'public, max-age=31536000, immutable'
+
+# Nome versionado (ex.: js/main.1a2b3c4d5e6f.js) -> conteúdo e variantes
+arquivos_versionados = {}
+
+# Caminho original (ex.: js/main.js) -> nome versionado
+nomes_versionados = {}
+
+
+def preparar_arquivos_estaticos(app):
+    """Calcula o hash e as versões comprimidas dos arquivos versionados
+
+    A compressão (no nível máximo) é feita uma única vez, na inicialização.
+    Também registra a rota /assets e a função `arquivo_estatico` nos templates.
+    """
+    for caminho in ARQUIVOS_VERSIONADOS:
+        with open(os.path.join(app.static_folder, caminho), 'rb') as arquivo:
+            conteudo = arquivo.read()
+
+        hash_conteudo = hashlib.sha256(conteudo).hexdigest()[:12]
+        base, extensao = os.path.splitext(caminho)
+        nome = f'{base}.{hash_conteudo}{extensao}'
+
+        variantes = {None: conteudo}
+        for codificacao in codificacoes_disponiveis():
+            variantes[codificacao] = comprimir(conteudo, codificacao, maximo=True)
+
+        arquivos_versionados[nome] = {
+            'hash': hash_conteudo,
+            'mimetype': mimetypes.guess_type(caminho)[0],
+            'variantes': variantes
+        }
+        nomes_versionados[caminho] = nome
+
+    app.add_url_rule('/assets/<path:nome>', 'arquivo_versionado', servir_arquivo_versionado)
+    app.add_template_global(url_arquivo_estatico, 'arquivo_estatico')
+
+
+def url_arquivo_estatico(caminho):
+    """Retorna a URL com hash do arquivo (ou a URL comum de /static)"""
+    nome = nomes_versionados.get(caminho)
+    if nome is None:
+        return url_for('static', filename=caminho)
+    return url_for('arquivo_versionado', nome=nome)
+
+
+def servir_arquivo_versionado(nome):
+    """Serve a variante pré-comprimida aceita pelo cliente, com cache longo"""
+    arquivo = arquivos_versionados.get(nome)
+    if arquivo is None:
+        abort(404)
+
+    codificacao = escolher_codificacao()
+    resposta = current_app.response_class(
+        arquivo['variantes'][codificacao], mimetype=arquivo['mimetype']
+    )
+    resposta.set_etag(arquivo['hash'])
+    if codificacao:
+        resposta.headers['Content-Encoding'] = codificacao
+        sufixar_etag(resposta, codificacao)
+    resposta.vary.add('Accept-Encoding')
+    resposta.headers['Cache-Control'] = CACHE_CONTROL_VERSIONADOS
+    return resposta.make_conditional(request)
@@ -0,0 +1,51 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from sqlalchemy import event
+
+
+# Fila única de escritores deste processo: as threads esperam a vez aqui,
+# em vez de disputarem o lock do arquivo do SQLite (e receberem
+# "database is locked" quando a espera passa do busy_timeout)
+trava_escrita = threading.RLock()
+
+
+def configurar_sqlite(engine, pragmas):
+    """Aplica os PRAGMAs em cada nova conexão do engine (apenas SQLite)
+
+    Com WAL, leitores não bloqueiam o escritor nem são bloqueados por ele;
+    o busy_timeout faz escritores de outros processos esperarem a vez.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def aplicar_pragmas(conexao_dbapi, registro_conexao):
+        cursor = conexao_dbapi.cursor()
+        try:
+            for nome, valor in pragmas.items():
+                cursor.execute(f'PRAGMA {nome} = {valor}')
+        finally:
+            cursor.close()
+
+
+@contextmanager
+def escrita():
+    """Executa o bloco com a vez de escrita deste processo
+
+    Deve envolver desde o primeiro comando de escrita até o commit. É
+    reentrante, então blocos aninhados (ex.: lotes de uma importação
+    dentro de uma rota já serializada) não travam.
+    """
+    with trava_escrita:
+        yield
+
+
+def serializar_escrita(funcao):
+    """Decorador para rotas que escrevem no banco (ver escrita())"""
+    @wraps(funcao)
+    def executar(*args, **kwargs):
+        with escrita():
+            return funcao(*args, **kwargs)
+    return executar
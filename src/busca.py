@@ -0,0 +1,127 @@
+import re
+
+from sqlalchemy import column, table, text
+from sqlalchemy.exc import OperationalError
+
+from src.extensions import db
+
+
+# Tabela virtual FTS5 espelhando as colunas de texto de `cursos`
+TABELA_BUSCA = 'cursos_fts'
+
+# Colunas indexadas para cada valor aceito em `tipo_busca`
+COLUNAS_BUSCA = {
+    'curso': 'nome',
+    'area': 'area',
+    'metodologia': 'metodologia',
+    'faixa': 'faixa',
+}
+
+# Referência leve à tabela FTS (fora do metadata, para o create_all ignorá-la)
+cursos_fts = table(TABELA_BUSCA, column('rowid'), column('rank'))
+
+# O tokenizador remove acentos: "educacao" encontra "Educação"
+SQL_CRIAR_TABELA = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_BUSCA} USING fts5(
+        nome, area, metodologia, faixa,
+        content='cursos', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+# Gatilhos que mantêm o índice sincronizado em qualquer escrita,
+# inclusive nas inserções em lote da importação de planilhas
+SQL_GATILHOS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_BUSCA}_ai AFTER INSERT ON cursos BEGIN
+        INSERT INTO {TABELA_BUSCA}(rowid, nome, area, metodologia, faixa)
+        VALUES (new.id, new.nome, new.area, new.metodologia, new.faixa);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_BUSCA}_ad AFTER DELETE ON cursos BEGIN
+        INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}, rowid, nome, area, metodologia, faixa)
+        VALUES ('delete', old.id, old.nome, old.area, old.metodologia, old.faixa);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_BUSCA}_au
+    AFTER UPDATE OF nome, area, metodologia, faixa ON cursos BEGIN
+        INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}, rowid, nome, area, metodologia, faixa)
+        VALUES ('delete', old.id, old.nome, old.area, old.metodologia, old.faixa);
+        INSERT INTO {TABELA_BUSCA}(rowid, nome, area, metodologia, faixa)
+        VALUES (new.id, new.nome, new.area, new.metodologia, new.faixa);
+    END
+    """,
+]
+
+# Cache por processo indicando se o índice existe no banco
+_indice_disponivel = None
+
+
+def criar_indice_busca():
+    """Cria a tabela FTS5 e os gatilhos de sincronização, se ainda não existirem
+
+    Retorna False quando o SQLite não foi compilado com FTS5; nesse caso a
+    listagem continua usando LIKE.
+    """
+    global _indice_disponivel
+
+    try:
+        with db.engine.begin() as conexao:
+            existia = conexao.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :nome"),
+                {'nome': TABELA_BUSCA}
+            ).first() is not None
+
+            conexao.exec_driver_sql(SQL_CRIAR_TABELA)
+            for sql in SQL_GATILHOS:
+                conexao.exec_driver_sql(sql)
+
+            # Popular o índice com os cursos já existentes
+            if not existia:
+                conexao.exec_driver_sql(
+                    f"INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}) VALUES ('rebuild')"
+                )
+    except OperationalError as e:
+        print(f"Índice de busca FTS5 indisponível: {e}")
+        _indice_disponivel = False
+        return False
+
+    _indice_disponivel = True
+    return True
+
+
+def indice_busca_disponivel():
+    """Verifica (uma vez por processo) se a tabela FTS5 existe no banco"""
+    global _indice_disponivel
+
+    if _indice_disponivel is None:
+        _indice_disponivel = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :nome"),
+            {'nome': TABELA_BUSCA}
+        ).first() is not None
+    return _indice_disponivel
+
+
+def montar_expressao_busca(busca, tipo_busca='curso'):
+    """Converte o texto digitado em uma expressão MATCH do FTS5
+
+    Cada palavra vira um prefixo entre aspas ("dir"*), de modo que a busca
+    funciona enquanto o usuário digita e caracteres especiais não quebram
+    a sintaxe. Retorna None se não houver palavras ou o tipo for inválido.
+    """
+    coluna = COLUNAS_BUSCA.get(tipo_busca)
+    palavras = re.findall(r'\w+', busca or '')
+    if not coluna or not palavras:
+        return None
+
+    termos = ' AND '.join(f'"{palavra}"*' for palavra in palavras)
+    return f'{coluna} : ({termos})'
+
+
+def filtro_busca(expressao):
+    """Retorna a condição MATCH para usar junto com o join em `cursos_fts`"""
+    return text(f'{TABELA_BUSCA} MATCH :expressao_busca').bindparams(
+        expressao_busca=expressao
+    )
@@ -0,0 +1,147 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from flask import current_app, request
+
+from src.compressao import (
+    comprimir_resposta, escolher_codificacao, remover_sufixo_etag, sufixar_etag
+)
+from src.versao_dados import obter_estado_versao
+
+
+# Limites do cache de respostas serializadas (por processo)
+MAXIMO_RESPOSTAS_EM_CACHE = 64
+MAXIMO_BYTES_EM_CACHE = 32 * 1024 * 1024  # 32MB
+
+
+class CacheLRU:
+    """Cache LRU de respostas serializadas, limitado por quantidade e por bytes
+
+    Cada item é uma tupla cujo primeiro elemento é o corpo (bytes), usado
+    na contagem de bytes. Corpos maiores que um quarto do limite não são
+    guardados, para que uma única listagem completa não expulse as outras.
+    """
+
+    def __init__(self, maximo_itens, maximo_bytes):
+        self.maximo_itens = maximo_itens
+        self.maximo_bytes = maximo_bytes
+        self.itens = OrderedDict()
+        self.total_bytes = 0
+        self.trava = threading.Lock()
+
+    def obter(self, chave):
+        """Retorna o item guardado na chave (ou None), marcando-o como usado"""
+        with self.trava:
+            item = self.itens.get(chave)
+            if item is not None:
+                self.itens.move_to_end(chave)
+            return item
+
+    def guardar(self, chave, item):
+        """Guarda o item e remove os usados há mais tempo se necessário"""
+        if len(item[0]) > self.maximo_bytes // 4:
+            return
+
+        with self.trava:
+            anterior = self.itens.pop(chave, None)
+            if anterior is not None:
+                self.total_bytes -= len(anterior[0])
+
+            self.itens[chave] = item
+            self.total_bytes += len(item[0])
+
+            while (len(self.itens) > self.maximo_itens
+                   or self.total_bytes > self.maximo_bytes):
+                _, removido = self.itens.popitem(last=False)
+                self.total_bytes -= len(removido[0])
+
+    def limpar(self):
+        """Remove todos os itens"""
+        with self.trava:
+            self.itens.clear()
+            self.total_bytes = 0
+
+
+cache_respostas = CacheLRU(MAXIMO_RESPOSTAS_EM_CACHE, MAXIMO_BYTES_EM_CACHE)
+
+
+def normalizar_query_string():
+    """Retorna a query string com os parâmetros em ordem alfabética
+
+    Assim `?area=X&faixa=Y` e `?faixa=Y&area=X` usam a mesma entrada do cache.
+    """
+    return urlencode(sorted(request.args.items(multi=True)))
+
+
+def cliente_tem_versao(etag, ultima_alteracao=None):
+    """Indica se a cópia do cliente corresponde à versão atual dos dados
+
+    O If-None-Match tem precedência sobre o If-Modified-Since. ETags com o
+    sufixo de compressão (-gzip, -br) valem pela versão sem sufixo.
+    """
+    if request.if_none_match:
+        return request.if_none_match.star_tag or any(
+            remover_sufixo_etag(tag) == etag
+            for tag in request.if_none_match.as_set(include_weak=True)
+        )
+    if request.if_modified_since and ultima_alteracao is not None:
+        return ultima_alteracao <= request.if_modified_since
+    return False
+
+
+def responder_com_cache(prefixo, gerar_resposta, tabela='cursos'):
+    """Responde um GET de listagem com ETag, Last-Modified e cache em memória
+
+    O ETag (forte) e o Last-Modified vêm da versão dos dados da tabela. Se
+    o cliente já tem a versão atual (If-None-Match ou If-Modified-Since),
+    a resposta é 304 sem corpo. Caso contrário o corpo é lido do cache,
+    indexado pela query string normalizada, pela versão e pela
+    codificação aceita, ou gerado por `gerar_resposta()`, comprimido e
+    guardado quando o status for 200.
+    """
+    versao, atualizado_em = obter_estado_versao(tabela)
+    etag = f'{prefixo}-{versao}'
+
+    # HTTP só tem precisão de segundos; a data do banco está em UTC. Se a
+    # última escrita foi no segundo atual, outra escrita ainda pode vir no
+    # mesmo segundo sem mudar o Last-Modified: nesse caso ele é omitido e
+    # só o ETag vale.
+    ultima_alteracao = None
+    if atualizado_em is not None:
+        ultima_alteracao = atualizado_em.replace(microsecond=0, tzinfo=timezone.utc)
+        if ultima_alteracao >= datetime.now(timezone.utc).replace(microsecond=0):
+            ultima_alteracao = None
+
+    codificacao = escolher_codificacao()
+    if cliente_tem_versao(etag, ultima_alteracao):
+        resposta = current_app.response_class(status=304)
+        resposta.set_etag(etag)
+        if codificacao:
+            sufixar_etag(resposta, codificacao)
+    else:
+        chave = (prefixo, request.path, normalizar_query_string(), versao, codificacao)
+        em_cache = cache_respostas.obter(chave)
+        if em_cache is not None:
+            corpo, codificacao_corpo = em_cache
+            resposta = current_app.response_class(corpo, mimetype='application/json')
+            resposta.set_etag(etag)
+            if codificacao_corpo:
+                resposta.headers['Content-Encoding'] = codificacao_corpo
+                sufixar_etag(resposta, codificacao_corpo)
+        else:
+            resposta = current_app.make_response(gerar_resposta())
+            if resposta.status_code != 200:
+                return resposta
+            resposta.set_etag(etag)
+            comprimir_resposta(resposta)
+            cache_respostas.guardar(
+                chave, (resposta.get_data(), resposta.headers.get('Content-Encoding'))
+            )
+
+    if ultima_alteracao is not None:
+        resposta.last_modified = ultima_alteracao
+    resposta.vary.add('Accept-Encoding')
+    resposta.headers['Cache-Control'] = 'no-cache'
+    return resposta
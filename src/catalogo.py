@@ -0,0 +1,161 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+from flask import current_app
+
+from src.curso import Curso
+from src.estatisticas import calcular_estatisticas, estatisticas_de_contagens
+from src.serializacao import COLUNAS_CURSO, consultar_colunas
+from src.versao_dados import obter_versao
+
+
+# Colunas usadas como facetas (filtros por igualdade)
+FACETAS = ('area', 'metodologia', 'faixa')
+
+# Cursos lidos do banco por vez ao montar o catálogo
+TAMANHO_LOTE_CARGA = 5000
+
+# URI do banco -> catálogo da versão mais recente carregada neste processo
+catalogos = {}
+trava_catalogo = threading.Lock()
+
+
+class Catalogo:
+    """Cópia em memória dos cursos ativos de uma versão dos dados
+
+    Os cursos ficam em colunas (uma lista por campo, na ordem do id), e
+    cada valor de área, metodologia e faixa aponta para o conjunto de
+    posições dos cursos que o têm. Os dados de um catálogo nunca mudam
+    depois de montado: uma nova versão dos dados gera um novo catálogo.
+    """
+
+    def __init__(self, versao, linhas):
+        self.versao = versao
+        self.ids = array('q')
+        self.colunas = {campo: [] for campo in COLUNAS_CURSO if campo not in ('id', 'ativo')}
+        self.facetas = {campo: {} for campo in FACETAS}
+        self.contagens = Counter()
+
+        # Valores repetidos (área, metodologia, faixa) compartilham o mesmo objeto
+        valores = {}
+
+        for posicao, linha in enumerate(linhas):
+            curso = dict(zip(COLUNAS_CURSO, linha))
+            self.ids.append(curso['id'])
+            for campo in FACETAS:
+                curso[campo] = valores.setdefault(curso[campo], curso[campo])
+                self.facetas[campo].setdefault(curso[campo], set()).add(posicao)
+            for campo, coluna in self.colunas.items():
+                coluna.append(curso[campo])
+            self.contagens[(curso['area'], curso['metodologia'], curso['faixa'])] += 1
+
+        # Posições ordenadas por combinação de filtros, calculadas sob demanda
+        self.filtrados = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def filtrar(self, filtros):
+        """Retorna as posições (em ordem de id) dos cursos que atendem aos filtros"""
+        chave = tuple(filtros.get(campo) for campo in FACETAS)
+        if not any(chave):
+            return range(len(self.ids))
+
+        posicoes = self.filtrados.get(chave)
+        if posicoes is not None:
+            return posicoes
+
+        conjuntos = []
+        for campo, valor in zip(FACETAS, chave):
+            if valor:
+                conjunto = self.facetas[campo].get(valor)
+                if not conjunto:
+                    # Valores inexistentes não são guardados em self.filtrados
+                    return ()
+                conjuntos.append(conjunto)
+
+        conjuntos.sort(key=len)
+        posicoes = array('q', sorted(conjuntos[0].intersection(*conjuntos[1:])))
+        self.filtrados[chave] = posicoes
+        return posicoes
+
+    def montar_cursos(self, posicoes, campos=COLUNAS_CURSO):
+        """Monta os dicionários dos cursos nas posições, só com os campos pedidos"""
+        colunas = [(campo, self.ids if campo == 'id' else self.colunas.get(campo))
+                   for campo in campos]
+        return [{campo: True if coluna is None else coluna[posicao]
+                 for campo, coluna in colunas}
+                for posicao in posicoes]
+
+    def listar(self, filtros, campos, after=None, limit=None):
+        """Página da listagem: retorna (cursos, tem_mais, total dos filtros)
+
+        Mesma ordem (id) e mesmo cursor (`after` = último id) da consulta
+        ao banco.
+        """
+        posicoes = self.filtrar(filtros)
+        total = len(posicoes)
+
+        if after is not None:
+            posicoes = posicoes[bisect_left(posicoes, bisect_right(self.ids, after)):]
+
+        tem_mais = False
+        if limit is not None:
+            tem_mais = len(posicoes) > limit
+            posicoes = posicoes[:limit]
+
+        return self.montar_cursos(posicoes, campos), tem_mais, total
+
+    def cursos_por_ids(self, curso_ids, campos=COLUNAS_CURSO):
+        """Retorna os cursos ativos com os ids informados, em ordem de id"""
+        posicoes = []
+        for curso_id in sorted(set(curso_ids)):
+            posicao = bisect_left(self.ids, curso_id)
+            if posicao < len(self.ids) and self.ids[posicao] == curso_id:
+                posicoes.append(posicao)
+        return self.montar_cursos(posicoes, campos)
+
+    def estatisticas(self, filtros=None):
+        """Estatísticas dos cursos que atendem aos filtros (ver estatisticas.py)"""
+        if not filtros or not any(filtros.get(campo) for campo in FACETAS):
+            return estatisticas_de_contagens(
+                (area, metodologia, faixa, quantidade)
+                for (area, metodologia, faixa), quantidade in self.contagens.items()
+            )
+        return calcular_estatisticas(self.montar_cursos(self.filtrar(filtros), FACETAS))
+
+
+def catalogo_habilitado():
+    """Indica se a aplicação usa o catálogo em memória (CATALOGO_EM_MEMORIA)"""
+    return bool(current_app.config.get('CATALOGO_EM_MEMORIA'))
+
+
+def carregar_catalogo(versao):
+    """Lê do banco os cursos ativos e monta o catálogo da versão informada"""
+    linhas = consultar_colunas().filter(Curso.ativo == True).order_by(Curso.id)
+    return Catalogo(versao, linhas.yield_per(TAMANHO_LOTE_CARGA))
+
+
+def obter_catalogo():
+    """Retorna o catálogo da versão atual dos dados, recarregando se ela mudou
+
+    A troca é atômica: quem já tem o catálogo anterior continua usando-o
+    até o fim da requisição, e só uma thread recarrega cada versão.
+    """
+    uri = current_app.config['SQLALCHEMY_DATABASE_URI']
+    versao = obter_versao()
+    catalogo = catalogos.get(uri)
+    if catalogo is not None and catalogo.versao == versao:
+        return catalogo
+
+    with trava_catalogo:
+        catalogo = catalogos.get(uri)
+        if catalogo is None or catalogo.versao != versao:
+            # A versão é lida antes dos cursos: se houver uma escrita no
+            # meio, o catálogo fica com uma versão antiga e é recarregado
+            # na próxima leitura (nunca o contrário)
+            catalogo = carregar_catalogo(versao)
+            catalogos[uri] = catalogo
+        return catalogo
@@ -0,0 +1,68 @@
+import click
+from flask import current_app
+
+from src.extensions import db
+
+
+def inicializar_banco():
+    """Cria as tabelas, aplica as migrações e cria os cursos iniciais
+
+    Deve rodar dentro de um contexto da aplicação, em um único processo.
+    """
+    from src.migracoes import aplicar_migracoes
+    from src.populate_db import criar_cursos_iniciais
+
+    db.create_all()
+
+    # Aplicar índices e busca textual (FTS5) em bancos já existentes
+    aplicar_migracoes()
+
+    # Popular com dados iniciais
+    criar_cursos_iniciais()
+
+
+@click.command('inicializar-banco')
+def inicializar_banco_comando():
+    """Cria tabelas, índices e dados iniciais (uma vez a cada deploy)"""
+    inicializar_banco()
+    click.echo('Banco inicializado')
+
+
+@click.command('retomar-importacoes')
+def retomar_importacoes_comando():
+    """Conclui importações interrompidas, antes de iniciar os workers
+
+    As importações são executadas neste processo, até o fim. Com vários
+    workers, retomá-las dentro de cada um faria a mesma importação rodar
+    mais de uma vez.
+    """
+    from src.importacao_jobs import retomar_jobs_pendentes
+
+    retomados = retomar_jobs_pendentes(current_app._get_current_object(), em_segundo_plano=False)
+    click.echo(f'{len(retomados)} importação(ões) retomada(s)')
+
+
+@click.command('expurgar-cursos')
+@click.option('--dias', type=int, default=None,
+              help='Remove cursos excluídos há mais de N dias (padrão: EXPURGO_RETENCAO_DIAS)')
+def expurgar_cursos_comando(dias):
+    """Remove fisicamente os cursos excluídos e compacta o banco
+
+    Feito para o cron, fora do horário de pico (ex.: 0 3 * * *).
+    """
+    from src.expurgo import executar_expurgo
+
+    config = dict(current_app.config)
+    if dias is not None:
+        config['EXPURGO_RETENCAO_DIAS'] = dias
+
+    resultado = executar_expurgo(config)
+    compactado = ', banco compactado' if resultado['compactado'] else ''
+    click.echo(f"{resultado['removidos']} curso(s) removido(s){compactado}")
+
+
+def registrar_comandos(app):
+    """Registra os comandos no `flask` (ex.: flask --app app inicializar-banco)"""
+    app.cli.add_command(inicializar_banco_comando)
+    app.cli.add_command(retomar_importacoes_comando)
+    app.cli.add_command(expurgar_cursos_comando)
@@ -0,0 +1,90 @@
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    # O brotli é opcional; sem ele apenas gzip é oferecido
+    brotli = None
+
+
+# Tipos de resposta comprimidos dinamicamente
+TIPOS_COMPRIMIVEIS = ('application/json',)
+
+# Níveis de compressão: rápidos para respostas dinâmicas, máximos para
+# arquivos comprimidos uma única vez
+NIVEL_GZIP = 6
+NIVEL_BROTLI = 5
+NIVEL_GZIP_MAXIMO = 9
+NIVEL_BROTLI_MAXIMO = 11
+
+
+def codificacoes_disponiveis():
+    """Retorna as codificações suportadas, da preferida para a menos preferida"""
+    if brotli is not None:
+        return ('br', 'gzip')
+    return ('gzip',)
+
+
+def escolher_codificacao():
+    """Escolhe a codificação pelo Accept-Encoding da requisição (ou None)"""
+    aceitas = request.accept_encodings
+    for codificacao in codificacoes_disponiveis():
+        if aceitas[codificacao]:
+            return codificacao
+    return None
+
+
+def comprimir(dados, codificacao, maximo=False):
+    """Comprime os bytes com a codificação informada
+
+    O gzip é gerado sem data de modificação, para que o mesmo conteúdo
+    produza sempre os mesmos bytes (necessário para ETags fortes).
+    """
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=NIVEL_BROTLI_MAXIMO if maximo else NIVEL_BROTLI)
+    return gzip.compress(dados, compresslevel=NIVEL_GZIP_MAXIMO if maximo else NIVEL_GZIP, mtime=0)
+
+
+def sufixar_etag(resposta, codificacao):
+    """Acrescenta a codificação ao ETag, que passa a identificar a versão comprimida"""
+    etag, fraco = resposta.get_etag()
+    if etag:
+        resposta.set_etag(f'{etag}-{codificacao}', fraco)
+
+
+def remover_sufixo_etag(etag):
+    """Retorna o ETag sem o sufixo de codificação acrescentado por sufixar_etag"""
+    for codificacao in ('br', 'gzip'):
+        if etag.endswith(f'-{codificacao}'):
+            return etag[:-len(codificacao) - 1]
+    return etag
+
+
+def comprimir_resposta(resposta):
+    """Comprime respostas JSON acima do tamanho mínimo configurado
+
+    Registrada como after_request. Respostas de streaming, arquivos
+    (direct_passthrough) e respostas já codificadas não são alteradas.
+    """
+    if (resposta.status_code != 200
+            or resposta.direct_passthrough
+            or resposta.is_streamed
+            or 'Content-Encoding' in resposta.headers
+            or resposta.mimetype not in TIPOS_COMPRIMIVEIS):
+        return resposta
+
+    dados = resposta.get_data()
+    if len(dados) < current_app.config['COMPRESSAO_TAMANHO_MINIMO']:
+        return resposta
+
+    resposta.vary.add('Accept-Encoding')
+    codificacao = escolher_codificacao()
+    if codificacao is None:
+        return resposta
+
+    resposta.set_data(comprimir(dados, codificacao))
+    resposta.headers['Content-Encoding'] = codificacao
+    sufixar_etag(resposta, codificacao)
+    return resposta
@@ -19,6 +19,22 @@ class Curso(db.Model):
     faixa = db.Column(db.String(50), nullable=False)
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
     ativo = db.Column(db.Boolean, default=True)
+    # Quando o curso foi excluído (desativado); usado pelo expurgo
+    excluido_em = db.Column(db.DateTime, nullable=True)
+
+    # Índices para os filtros usados nas rotas. Os parciais cobrem apenas
+    # cursos ativos, que são os únicos consultados pela listagem e opções.
+    __table_args__ = (
+        db.Index('ix_cursos_nome_ativo', 'nome', 'ativo'),
+        db.Index('ix_cursos_ativos', 'id', sqlite_where=ativo == True),
+        db.Index('ix_cursos_ativos_area', 'area', 'metodologia', 'faixa',
+                 sqlite_where=ativo == True),
+        db.Index('ix_cursos_ativos_metodologia', 'metodologia', 'faixa',
+                 sqlite_where=ativo == True),
+        db.Index('ix_cursos_ativos_faixa', 'faixa', sqlite_where=ativo == True),
+        # Cursos excluídos, na ordem em que o expurgo os remove
+        db.Index('ix_cursos_excluidos', 'excluido_em', sqlite_where=ativo == False),
+    )
     
     def __init__(self, nome, area, metodologia, faixa):
         """Construtor da classe"""
@@ -1,57 +1,255 @@
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import and_, func, or_
 from src.curso import Curso, db
+from src.versao_dados import incrementar_versao, obter_versao
+from src.estatisticas import estatisticas_de_contagens
+from src.busca import cursos_fts, filtro_busca, indice_busca_disponivel, montar_expressao_busca
+from src.banco import serializar_escrita
+from src.catalogo import catalogo_habilitado, obter_catalogo
+from src.cache_respostas import cliente_tem_versao, responder_com_cache
+from src.serializacao import COLUNAS_CURSO, consultar_colunas, linhas_para_dicts, resposta_json
 import os
+import threading
+import zipfile
+from datetime import datetime
 
 
 # Criar blueprint para organizar as rotas
 curso_bp = Blueprint('cursos', __name__)
 
+# Campos que podem ser solicitados na listagem via parâmetro `fields`
+CAMPOS_LISTAGEM = ('id', 'nome', 'area', 'metodologia', 'faixa', 'data_criacao', 'ativo')
+
+# Filtros aceitos na listagem e nas exportações
+FILTROS_CURSOS = ('area', 'metodologia', 'faixa', 'busca', 'tipo_busca')
+
+# Tamanho máximo de página aceito no parâmetro `limit`
+LIMITE_MAXIMO_PAGINA = 500
+
+
+def parametro_booleano(nome):
+    """Interpreta um parâmetro da URL como booleano (1, true, sim)"""
+    return request.args.get(nome, '').lower() in ('1', 'true', 'sim')
+
+
+def obter_campos_solicitados():
+    """Lê o parâmetro `fields` e retorna a lista de campos pedidos (ou None)"""
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+
+    campos = [campo.strip() for campo in fields.split(',') if campo.strip()]
+    invalidos = [campo for campo in campos if campo not in CAMPOS_LISTAGEM]
+    if invalidos:
+        raise ValueError(f'Campos inválidos: {", ".join(invalidos)}')
+
+    # O id é sempre retornado, pois é o cursor da paginação
+    if 'id' not in campos:
+        campos.insert(0, 'id')
+    return campos
+
+
+def ler_limite(limit):
+    """Interpreta o parâmetro `limit` (None quando ausente)
+
+    Valores não numéricos ou fora da faixa são rejeitados, em vez de
+    caírem na listagem completa sem paginação.
+    """
+    if limit is None:
+        return None
+
+    try:
+        limite = int(limit)
+    except ValueError:
+        limite = None
+    if limite is None or not 1 <= limite <= LIMITE_MAXIMO_PAGINA:
+        raise ValueError(f'O parâmetro limit deve ser um inteiro entre 1 e {LIMITE_MAXIMO_PAGINA}')
+    return limite
+
+
+def ler_cursor(after, por_relevancia):
+    """Interpreta o cursor `after`: um id ou, na busca por relevância, rank:id"""
+    if not after:
+        return None
+
+    try:
+        if por_relevancia:
+            rank, curso_id = after.rsplit(':', 1)
+            return float(rank), int(curso_id)
+        return int(after)
+    except ValueError:
+        raise ValueError('Cursor after inválido')
+
+
+def ler_filtros(origem):
+    """Extrai os filtros de cursos de um dicionário (args da URL ou JSON)"""
+    filtros = {campo: origem.get(campo) for campo in FILTROS_CURSOS if origem.get(campo)}
+    filtros.setdefault('tipo_busca', 'curso')
+    return filtros
+
+
+def montar_expressao_dos_filtros(filtros):
+    """Retorna a expressão FTS5 da busca textual, se houver busca e índice"""
+    if filtros.get('busca') and indice_busca_disponivel():
+        return montar_expressao_busca(filtros['busca'], filtros['tipo_busca'])
+    return None
+
+
+def aplicar_filtros(query, filtros, expressao=None):
+    """Restringe a consulta aos cursos ativos que atendem aos filtros
+
+    Com `expressao` (FTS5) a busca usa o índice de texto; sem ela, a busca
+    cai no LIKE sobre a coluna escolhida em `tipo_busca`.
+    """
+    area = filtros.get('area')
+    metodologia = filtros.get('metodologia')
+    faixa = filtros.get('faixa')
+    busca = filtros.get('busca')
+    tipo_busca = filtros.get('tipo_busca', 'curso')
+
+    # Começar com todos os cursos ativos
+    query = query.filter(Curso.ativo == True)
+
+    # Aplicar filtros se fornecidos
+    if area:
+        query = query.filter(Curso.area == area)
+
+    if metodologia:
+        query = query.filter(Curso.metodologia == metodologia)
+
+    if faixa:
+        query = query.filter(Curso.faixa == faixa)
+
+    # Aplicar busca por texto
+    if expressao:
+        query = query.join(cursos_fts, cursos_fts.c.rowid == Curso.id)
+        query = query.filter(filtro_busca(expressao))
+    elif busca:
+        busca = f"%{busca}%"  # Adicionar wildcards para LIKE
+
+        if tipo_busca == 'curso':
+            query = query.filter(Curso.nome.like(busca))
+        elif tipo_busca == 'area':
+            query = query.filter(Curso.area.like(busca))
+        elif tipo_busca == 'metodologia':
+            query = query.filter(Curso.metodologia.like(busca))
+        elif tipo_busca == 'faixa':
+            query = query.filter(Curso.faixa.like(busca))
+
+    return query
+
+
 @curso_bp.route('/cursos', methods=['GET'])
 def listar_cursos():
-    """Lista todos os cursos com filtros opcionais"""
+    """Lista cursos com filtros opcionais, paginação por cursor e projeção de campos
+
+    Parâmetros de paginação (opcionais):
+        limit: quantidade máxima de cursos na página
+        after: cursor devolvido em `next_after` na página anterior
+        fields: lista de campos separados por vírgula (ex.: nome,area)
+        total: se verdadeiro, inclui a contagem total dos filtros aplicados
+
+    Sem `limit` a resposta continua trazendo todos os cursos e o total.
+    Com `busca`, os cursos vêm ordenados por relevância (índice FTS5).
+
+    A resposta leva ETag e Last-Modified da versão dos dados (304 quando o
+    cliente já a tem) e fica em cache enquanto a versão não mudar.
+    """
+    return responder_com_cache('cursos', montar_listagem_cursos)
+
+
+def montar_listagem_cursos():
+    """Consulta o banco e monta a resposta de listar_cursos"""
     try:
         # Pegar parâmetros de filtro da URL
-        area = request.args.get('area')
-        metodologia = request.args.get('metodologia')
-        faixa = request.args.get('faixa')
-        busca = request.args.get('busca')
-        tipo_busca = request.args.get('tipo_busca', 'curso')
-        
-        # Começar com todos os cursos ativos
-        query = Curso.query.filter_by(ativo=True)
-        
-        # Aplicar filtros se fornecidos
-        if area:
-            query = query.filter(Curso.area == area)
-        
-        if metodologia:
-            query = query.filter(Curso.metodologia == metodologia)
-            
-        if faixa:
-            query = query.filter(Curso.faixa == faixa)
-        
-        # Aplicar busca por texto
-        if busca:
-            busca = f"%{busca}%"  # Adicionar wildcards para LIKE
-            
-            if tipo_busca == 'curso':
-                query = query.filter(Curso.nome.like(busca))
-            elif tipo_busca == 'area':
-                query = query.filter(Curso.area.like(busca))
-            elif tipo_busca == 'metodologia':
-                query = query.filter(Curso.metodologia.like(busca))
-            elif tipo_busca == 'faixa':
-                query = query.filter(Curso.faixa.like(busca))
+        filtros = ler_filtros(request.args)
+
+        # Montar expressão de busca textual quando o índice FTS5 existir
+        expressao = montar_expressao_dos_filtros(filtros)
+        por_relevancia = expressao is not None
+
+        # Pegar parâmetros de paginação e projeção
+        try:
+            campos = obter_campos_solicitados()
+            limit = ler_limite(request.args.get('limit'))
+            after = ler_cursor(request.args.get('after'), por_relevancia)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        campos = campos or COLUNAS_CURSO
+
+        # Sem busca textual, a listagem pode ser servida pelo catálogo em memória
+        if catalogo_habilitado() and not filtros.get('busca'):
+            return listar_do_catalogo(filtros, campos, after, limit)
+
+        # Selecionar só as colunas pedidas, como tuplas (sem objetos do ORM)
+        query = consultar_colunas(campos)
+
+        # Aplicar filtros e busca por texto
+        query = aplicar_filtros(query, filtros, expressao)
+
+        # A contagem só é feita quando pedida (ou na listagem sem paginação)
+        total = None
+        if limit is not None and parametro_booleano('total'):
+            total = query.order_by(None).count()
+
+        # Ordenar por relevância (rank do FTS5) e desempatar pelo id
+        if por_relevancia:
+            query = query.add_columns(cursos_fts.c.rank)
+            if after is not None:
+                rank_anterior, id_anterior = after
+                query = query.filter(or_(
+                    cursos_fts.c.rank > rank_anterior,
+                    and_(cursos_fts.c.rank == rank_anterior, Curso.id > id_anterior)
+                ))
+            query = query.order_by(cursos_fts.c.rank, Curso.id)
+        elif after is not None:
+            query = query.filter(Curso.id > after)
+
+        # Sem busca, sempre em ordem de id (a mesma do catálogo em memória),
+        # também na listagem sem paginação
+        if not por_relevancia:
+            query = query.order_by(Curso.id)
+
+        # Paginação por cursor (keyset)
+        if limit is not None:
+            # Buscar um registro a mais para saber se existe próxima página
+            query = query.limit(limit + 1)
         
         # Executar query e converter para lista de dicionários
-        cursos = query.all()
-        cursos_dict = [curso.to_dict() for curso in cursos]
-        
-        return jsonify({
+        resultados = query.all()
+        tem_mais = limit is not None and len(resultados) > limit
+        if tem_mais:
+            resultados = resultados[:limit]
+
+        # Separar o rank adicionado pela ordenação por relevância
+        ranks = []
+        if por_relevancia:
+            ranks = [linha[-1] for linha in resultados]
+            resultados = [linha[:-1] for linha in resultados]
+
+        cursos_dict = linhas_para_dicts(resultados, campos)
+
+        resposta = {
             'success': True,
-            'cursos': cursos_dict,
-            'total': len(cursos_dict)
-        })
+            'cursos': cursos_dict
+        }
+
+        if limit is None:
+            resposta['total'] = len(cursos_dict)
+        else:
+            resposta['next_after'] = None
+            if tem_mais and por_relevancia:
+                resposta['next_after'] = f"{ranks[-1]!r}:{cursos_dict[-1]['id']}"
+            elif tem_mais:
+                resposta['next_after'] = cursos_dict[-1]['id']
+            if total is not None:
+                resposta['total'] = total
+
+        return resposta_json(resposta)
         
     except Exception as e:
         return jsonify({
@@ -63,7 +261,48 @@ def listar_cursos():
 
 
 
+def listar_do_catalogo(filtros, campos, after, limit):
+    """Monta a resposta de listar_cursos a partir do catálogo em memória"""
+    cursos_dict, tem_mais, total = obter_catalogo().listar(filtros, campos, after, limit)
+
+    resposta = {
+        'success': True,
+        'cursos': cursos_dict
+    }
+
+    if limit is None:
+        resposta['total'] = total
+    else:
+        resposta['next_after'] = cursos_dict[-1]['id'] if tem_mais else None
+        if parametro_booleano('total'):
+            resposta['total'] = total
+
+    return resposta_json(resposta)
+
+
+def validar_novo_curso(data):
+    """Retorna a mensagem de erro se faltar campo obrigatório (ou None)"""
+    if not data.get('nome'):
+        return 'Nome do curso é obrigatório'
+    if not data.get('metodologia'):
+        return 'Metodologia é obrigatória'
+    if not data.get('faixa'):
+        return 'Faixa é obrigatória'
+    return None
+
+
+def criar_curso_de_dados(data):
+    """Cria o objeto Curso a partir do JSON recebido"""
+    return Curso(
+        nome=data['nome'],
+        area=data.get('area', ''),  # Área pode ser vazia
+        metodologia=data['metodologia'],
+        faixa=data['faixa']
+    )
+
+
 @curso_bp.route('/cursos', methods=['POST'])
+@serializar_escrita
 def criar_curso():
     """Cria um novo curso"""
     try:
@@ -71,34 +310,19 @@ def criar_curso():
         data = request.get_json()
         
         # Validar campos obrigatórios
-        if not data.get('nome'):
-            return jsonify({
-                'success': False,
-                'error': 'Nome do curso é obrigatório'
-            }), 400
-            
-        if not data.get('metodologia'):
-            return jsonify({
-                'success': False,
-                'error': 'Metodologia é obrigatória'
-            }), 400
-            
-        if not data.get('faixa'):
+        erro = validar_novo_curso(data)
+        if erro:
             return jsonify({
                 'success': False,
-                'error': 'Faixa é obrigatória'
+                'error': erro
             }), 400
         
         # Criar novo curso
-        novo_curso = Curso(
-            nome=data['nome'],
-            area=data.get('area', ''),  # Área pode ser vazia
-            metodologia=data['metodologia'],
-            faixa=data['faixa']
-        )
+        novo_curso = criar_curso_de_dados(data)
         
         # Salvar no banco
         db.session.add(novo_curso)
+        incrementar_versao()
         db.session.commit()
         
         return jsonify({
@@ -119,12 +343,13 @@ def criar_curso():
 
 
 @curso_bp.route('/cursos/<int:curso_id>', methods=['PUT'])
+@serializar_escrita
 def atualizar_curso(curso_id):
     """Atualiza um curso existente"""
     try:
-        # Buscar curso no banco
+        # Buscar curso no banco (cursos excluídos não podem ser editados)
         curso = Curso.query.get(curso_id)
-        if not curso:
+        if not curso or not curso.ativo:
             return jsonify({
                 'success': False,
                 'error': 'Curso não encontrado'
@@ -144,6 +369,7 @@ def atualizar_curso(curso_id):
             curso.faixa = data['faixa']
         
         # Salvar mudanças
+        incrementar_versao()
         db.session.commit()
         
         return jsonify({
@@ -164,22 +390,30 @@ def atualizar_curso(curso_id):
 
 
 @curso_bp.route('/cursos/<int:curso_id>', methods=['DELETE'])
+@serializar_escrita
 def excluir_curso(curso_id):
-    """Exclui um curso do banco de dados permanentemente"""
+    """Exclui um curso (exclusão lógica)
+
+    O curso é apenas desativado e deixa de aparecer na listagem, nas
+    opções e nas exportações. A remoção física fica com o expurgo
+    (src/expurgo.py), em lotes pequenos e fora do horário de pico.
+    """
     try:
         curso = Curso.query.get(curso_id)
-        if not curso:
+        if not curso or not curso.ativo:
             return jsonify({
                 'success': False,
                 'error': 'Curso não encontrado'
             }), 404
 
-        db.session.delete(curso)
+        curso.ativo = False
+        curso.excluido_em = datetime.utcnow()
+        incrementar_versao()
         db.session.commit()
 
         return jsonify({
             'success': True,
-            'message': 'Curso removido permanentemente'
+            'message': 'Curso removido com sucesso'
         })
 
     except Exception as e:
@@ -194,33 +428,248 @@ def excluir_curso(curso_id):
 
 
 
-@curso_bp.route('/cursos/opcoes', methods=['GET'])
-def obter_opcoes():
-    """Retorna opções disponíveis para filtros"""
+# Quantidade máxima de operações aceitas em uma chamada de /cursos/bulk
+LIMITE_OPERACOES_BULK = 1000
+
+# Maior valor de um INTEGER do SQLite
+MAIOR_ID = 2 ** 63 - 1
+
+
+def id_valido(valor):
+    """Indica se o valor vindo do JSON pode ser o id de um curso
+
+    bool é subclasse de int, então o teste é type() e não isinstance; ids
+    fora do intervalo do INTEGER do SQLite nem chegam à consulta.
+    """
+    return type(valor) is int and 1 <= valor <= MAIOR_ID
+
+# Campos que podem ser alterados em uma atualização
+CAMPOS_EDITAVEIS = ('nome', 'area', 'metodologia', 'faixa')
+
+
+@curso_bp.route('/cursos/bulk', methods=['POST'])
+@serializar_escrita
+def operacoes_em_lote():
+    """Cria, atualiza e exclui vários cursos em uma única transação
+
+    Corpo esperado (todas as listas são opcionais):
+        {
+            "criar": [{"nome": ..., "area": ..., "metodologia": ..., "faixa": ...}],
+            "atualizar": [{"id": 1, "nome": ...}],
+            "excluir": [1, 2, 3]
+        }
+
+    Itens inválidos ou inexistentes são reportados em `resultados` sem
+    impedir os demais; tudo o que é válido é gravado em um único commit.
+    """
     try:
-        # Buscar valores únicos para cada campo
-        areas = db.session.query(Curso.area).filter(
-            Curso.ativo == True,
-            Curso.area.isnot(None),
-            Curso.area != ''
-        ).distinct().all()
-        
-        metodologias = db.session.query(Curso.metodologia).filter(
-            Curso.ativo == True
-        ).distinct().all()
-        
-        faixas = db.session.query(Curso.faixa).filter(
-            Curso.ativo == True
-        ).distinct().all()
-        
+        data = request.get_json() or {}
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'error': 'O corpo deve ser um objeto JSON'
+            }), 400
+
+        criar = data.get('criar', [])
+        atualizar = data.get('atualizar', [])
+        excluir = data.get('excluir', [])
+
+        if not all(isinstance(lista, list) for lista in (criar, atualizar, excluir)):
+            return jsonify({
+                'success': False,
+                'error': 'criar, atualizar e excluir devem ser listas'
+            }), 400
+
+        if len(criar) + len(atualizar) + len(excluir) > LIMITE_OPERACOES_BULK:
+            return jsonify({
+                'success': False,
+                'error': f'Máximo de {LIMITE_OPERACOES_BULK} operações por requisição'
+            }), 400
+
+        resultados = {'criar': [], 'atualizar': [], 'excluir': []}
+
+        # Criações
+        novos_cursos = []
+        for indice, item in enumerate(criar):
+            erro = validar_novo_curso(item) if isinstance(item, dict) else 'Item inválido'
+            if erro:
+                resultados['criar'].append({'indice': indice, 'success': False, 'error': erro})
+                continue
+            novo_curso = criar_curso_de_dados(item)
+            novos_cursos.append((indice, novo_curso))
+        db.session.add_all(curso for _, curso in novos_cursos)
+
+        # Verificar de uma vez quais cursos a excluir existem (e ainda estão ativos)
+        ids_excluir = {curso_id for curso_id in excluir if id_valido(curso_id)}
+        ids_existentes = {
+            curso_id for (curso_id,) in
+            db.session.query(Curso.id).filter(Curso.id.in_(ids_excluir), Curso.ativo == True)
+        } if ids_excluir else set()
+
+        for indice, curso_id in enumerate(excluir):
+            if not id_valido(curso_id):
+                resultados['excluir'].append({
+                    'indice': indice, 'id': curso_id, 'success': False, 'error': 'Id inválido'
+                })
+            elif curso_id in ids_existentes:
+                resultados['excluir'].append({'indice': indice, 'id': curso_id, 'success': True})
+            else:
+                resultados['excluir'].append({
+                    'indice': indice, 'id': curso_id, 'success': False,
+                    'error': 'Curso não encontrado'
+                })
+
+        # Buscar de uma vez todos os cursos que serão atualizados
+        ids_atualizar = [item.get('id') for item in atualizar
+                         if isinstance(item, dict) and id_valido(item.get('id'))]
+        cursos_por_id = {
+            curso.id: curso
+            for curso in Curso.query.filter(Curso.id.in_(ids_atualizar), Curso.ativo == True)
+        } if ids_atualizar else {}
+
+        cursos_atualizados = []
+        for indice, item in enumerate(atualizar):
+            if not isinstance(item, dict) or not id_valido(item.get('id')):
+                resultados['atualizar'].append({
+                    'indice': indice, 'success': False, 'error': 'Item inválido'
+                })
+                continue
+
+            curso = cursos_por_id.get(item['id'])
+            if not curso:
+                resultados['atualizar'].append({
+                    'indice': indice, 'success': False, 'error': 'Curso não encontrado'
+                })
+                continue
+
+            if curso.id in ids_existentes:
+                resultados['atualizar'].append({
+                    'indice': indice, 'success': False,
+                    'error': 'Curso excluído na mesma operação'
+                })
+                continue
+
+            campos_vazios = [campo for campo in ('nome', 'metodologia', 'faixa')
+                             if campo in item and not item[campo]]
+            if campos_vazios:
+                resultados['atualizar'].append({
+                    'indice': indice, 'success': False,
+                    'error': f'Campo obrigatório vazio: {", ".join(campos_vazios)}'
+                })
+                continue
+
+            for campo in CAMPOS_EDITAVEIS:
+                if campo in item:
+                    setattr(curso, campo, item[campo])
+            cursos_atualizados.append((indice, curso))
+
+        # Exclusões lógicas com um único UPDATE (o expurgo remove as linhas depois)
+        if ids_existentes:
+            db.session.execute(
+                Curso.__table__.update()
+                .where(Curso.id.in_(ids_existentes))
+                .values(ativo=False, excluido_em=datetime.utcnow())
+            )
+
+        # Gravar tudo em um único commit
+        db.session.flush()
+        for indice, curso in novos_cursos:
+            resultados['criar'].append({'indice': indice, 'success': True, 'curso': curso.to_dict()})
+        for indice, curso in cursos_atualizados:
+            resultados['atualizar'].append({'indice': indice, 'success': True, 'curso': curso.to_dict()})
+
+        for lista in resultados.values():
+            lista.sort(key=lambda resultado: resultado['indice'])
+
+        if novos_cursos or cursos_atualizados or ids_existentes:
+            incrementar_versao()
+        db.session.commit()
+
         return jsonify({
             'success': True,
-            'opcoes': {
-                'areas': [area[0] for area in areas],
-                'metodologias': [met[0] for met in metodologias],
-                'faixas': [faixa[0] for faixa in faixas]
-            }
+            'resultados': resultados
         })
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+
+
+
+
+# Cache das opções de filtro, válido enquanto a versão dos dados não mudar
+cache_opcoes = {'versao': None, 'dados': None}
+trava_cache_opcoes = threading.Lock()
+
+
+def consultar_contagens(query):
+    """Agrupa os cursos da consulta por (área, metodologia, faixa) com a quantidade"""
+    return query.with_entities(
+        Curso.area, Curso.metodologia, Curso.faixa, func.count(Curso.id)
+    ).order_by(None).group_by(
+        Curso.area, Curso.metodologia, Curso.faixa
+    )
+
+
+def consultar_estatisticas(query):
+    """Calcula as estatísticas dos cursos da consulta com um único GROUP BY"""
+    return estatisticas_de_contagens(consultar_contagens(query))
+
+
+def calcular_opcoes():
+    """Calcula opções e contagens por valor com uma única consulta agrupada"""
+    if catalogo_habilitado():
+        estatisticas = obter_catalogo().estatisticas()
+    else:
+        estatisticas = consultar_estatisticas(Curso.query.filter(Curso.ativo == True))
+    contagens = {campo: estatisticas[campo] for campo in ('areas', 'metodologias', 'faixas')}
+
+    return {
+        'opcoes': {campo: sorted(contador) for campo, contador in contagens.items()},
+        'contagens': {campo: dict(sorted(contador.items()))
+                      for campo, contador in contagens.items()}
+    }
+
+
+def obter_opcoes_em_cache(versao):
+    """Retorna as opções da versão informada, recalculando se necessário"""
+    with trava_cache_opcoes:
+        if cache_opcoes['versao'] != versao:
+            cache_opcoes['dados'] = calcular_opcoes()
+            cache_opcoes['versao'] = versao
+        return cache_opcoes['dados']
+
+
+@curso_bp.route('/cursos/opcoes', methods=['GET'])
+def obter_opcoes():
+    """Retorna opções disponíveis para filtros e a quantidade de cursos em cada uma
+
+    A resposta leva um ETag com a versão dos dados; se o cliente enviar
+    If-None-Match com o mesmo valor, a resposta é 304 sem corpo.
+    """
+    try:
+        versao = obter_versao()
+        etag = f'opcoes-{versao}'
+
+        # Evitar o cálculo quando o cliente já tem a versão atual
+        if cliente_tem_versao(etag):
+            resposta = current_app.response_class(status=304)
+        else:
+            dados = obter_opcoes_em_cache(versao)
+            resposta = jsonify({
+                'success': True,
+                'opcoes': dados['opcoes'],
+                'contagens': dados['contagens']
+            })
+
+        resposta.set_etag(etag)
+        resposta.headers['Cache-Control'] = 'no-cache'
+        return resposta
         
     except Exception as e:
         return jsonify({
@@ -234,15 +683,43 @@ def obter_opcoes():
 
 
 from werkzeug.utils import secure_filename
-import openpyxl
 from flask import current_app
+from src.importacao import processar_planilha_excel, sincronizar_planilha_excel
+from src.importacao_jobs import ImportacaoJob, criar_job, enfileirar_job
 
 # Adicionar ao final do arquivo curso_routes.py
 
 @curso_bp.route('/cursos/upload', methods=['POST'])
 def upload_planilha():
-    """Faz upload de planilha Excel com cursos"""
+    """Faz upload de planilha Excel com cursos
+
+    Parâmetros opcionais na URL:
+        mode: insert (padrão, rejeita nomes existentes) ou upsert
+            (atualiza cursos com o mesmo nome e insere os novos)
+        desativar_ausentes: no upsert, desativa cursos ausentes da planilha
+        dry_run: retorna o resultado sem gravar nada no banco
+        assincrono: processa em segundo plano (apenas no modo insert)
+
+    A vez de escrita (ver src/banco.py) é tomada pela importação a cada
+    lote, e não pela requisição inteira.
+    """
     try:
+        modo = request.args.get('mode', 'insert')
+        dry_run = parametro_booleano('dry_run')
+        assincrono = parametro_booleano('assincrono')
+
+        if modo not in ('insert', 'upsert'):
+            return jsonify({
+                'success': False,
+                'error': 'Modo de importação inválido (use insert ou upsert)'
+            }), 400
+
+        if assincrono and (modo == 'upsert' or dry_run):
+            return jsonify({
+                'success': False,
+                'error': 'O modo assíncrono não suporta upsert nem dry_run'
+            }), 400
+
         # Verificar se arquivo foi enviado
         if 'arquivo' not in request.files:
             return jsonify({
@@ -270,15 +747,36 @@ def upload_planilha():
                 'error': 'Apenas arquivos Excel (.xlsx, .xls) são permitidos'
             }), 400
         
-        # Salvar arquivo temporariamente
-        caminho_arquivo = os.path.join(current_app.config['UPLOAD_FOLDER'], nome_arquivo)
-        arquivo.save(caminho_arquivo)
-        
-        # Processar planilha
-        resultado = processar_planilha_excel(caminho_arquivo)
-        
-        # Remover arquivo temporário
-        os.remove(caminho_arquivo)
+        # Modo assíncrono: guardar o arquivo e processar em segundo plano
+        if assincrono:
+            # O .xlsx é um arquivo zip; o .xls antigo só é lido no modo síncrono
+            if not zipfile.is_zipfile(arquivo.stream):
+                return jsonify({
+                    'success': False,
+                    'error': 'O modo assíncrono aceita apenas planilhas .xlsx'
+                }), 400
+            arquivo.stream.seek(0)
+            job = criar_job(arquivo, current_app.config['UPLOAD_FOLDER'])
+            enfileirar_job(current_app._get_current_object(), job.id)
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'job': job.to_dict()
+            }), 202
+
+        # Processar planilha direto do upload (o Werkzeug mantém arquivos
+        # grandes em um arquivo temporário, sem copiar para a pasta uploads)
+        if modo == 'upsert':
+            resultado = sincronizar_planilha_excel(
+                arquivo.stream,
+                desativar_ausentes=parametro_booleano('desativar_ausentes'),
+                dry_run=dry_run
+            )
+        else:
+            resultado = processar_planilha_excel(arquivo.stream, dry_run=dry_run)
+
+        if not resultado['success']:
+            return jsonify(resultado), 400
         
         return jsonify(resultado)
         
@@ -289,121 +787,259 @@ def upload_planilha():
         }), 500
 
 
-def processar_planilha_excel(caminho_arquivo):
-    """Processa planilha Excel e adiciona cursos ao banco"""
+@curso_bp.route('/cursos/upload/<job_id>', methods=['GET'])
+def consultar_importacao(job_id):
+    """Retorna o progresso de uma importação assíncrona"""
     try:
-        # Abrir planilha
-        workbook = openpyxl.load_workbook(caminho_arquivo)
-        sheet = workbook.active
-        
-        cursos_adicionados = []
-        erros = []
-        linha_atual = 1
-        
-        # Verificar se a primeira linha contém cabeçalhos
-        primeira_linha = [cell.value for cell in sheet[1]]
-        tem_cabecalho = any(str(cell).lower() in ['nome', 'curso', 'área', 'metodologia', 'faixa'] 
-                           for cell in primeira_linha if cell)
-        
-        # Definir linha inicial (pular cabeçalho se existir)
-        linha_inicial = 2 if tem_cabecalho else 1
-        
-        # Processar cada linha
-        for linha in sheet.iter_rows(min_row=linha_inicial, values_only=True):
-            linha_atual += 1
-            
-            # Pular linhas vazias
-            if not any(linha):
-                continue
-            
-            try:
-                # Extrair dados da linha (assumindo ordem: Nome, Área, Metodologia, Faixa)
-                nome = str(linha[0]).strip() if linha[0] else ''
-                area = str(linha[1]).strip() if linha[1] else ''
-                metodologia = str(linha[2]).strip() if linha[2] else ''
-                faixa = str(linha[3]).strip() if linha[3] else ''
-                
-                # Validar campos obrigatórios
-                if not nome:
-                    erros.append(f'Linha {linha_atual}: Nome do curso é obrigatório')
-                    continue
-                
-                if not metodologia:
-                    erros.append(f'Linha {linha_atual}: Metodologia é obrigatória')
-                    continue
-                
-                if not faixa:
-                    erros.append(f'Linha {linha_atual}: Faixa é obrigatória')
-                    continue
-                
-                # Verificar se curso já existe
-                curso_existente = Curso.query.filter_by(nome=nome, ativo=True).first()
-                if curso_existente:
-                    erros.append(f'Linha {linha_atual}: Curso "{nome}" já existe')
-                    continue
-                
-                # Criar novo curso
-                novo_curso = Curso(
-                    nome=nome,
-                    area=area,
-                    metodologia=metodologia,
-                    faixa=faixa
-                )
-                
-                db.session.add(novo_curso)
-                cursos_adicionados.append({
-                    'nome': nome,
-                    'area': area,
-                    'metodologia': metodologia,
-                    'faixa': faixa
-                })
-                
-                
-            except Exception as e:
-                erros.append(f'Linha {linha_atual}: Erro ao processar - {str(e)}')
-        
-        # Salvar todos os cursos de uma vez
-        if cursos_adicionados:
-            db.session.commit()
-        
-        return {
+        job = db.session.get(ImportacaoJob, job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Importação não encontrada'
+            }), 404
+
+        return jsonify({
             'success': True,
-            'cursos_adicionados': len(cursos_adicionados),
-            'erros': erros,
-            'detalhes': cursos_adicionados
-        }
-        
-        
-    except Exception as e:
-        db.session.rollback()
-        raise e
+            'job': job.to_dict()
+        })
 
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
 
 from flask import send_file, request, jsonify
-from src.pdf_generator import criar_pdf_design1, criar_pdf_design2  # certifique-se que está certo
+from src.exportacao_pdf import DESIGNS, ERRO, agendar_exportacao, chave_exportacao, obter_exportacao, obter_pdf_em_cache
+
+
+# Cursos lidos do banco por vez nas exportações
+TAMANHO_LOTE_EXPORTACAO = 500
+
+# Colunas usadas pelos geradores de PDF
+COLUNAS_PDF = ('id', 'nome', 'area', 'metodologia', 'faixa')
+
+
+def carregar_cursos_para_exportacao(curso_ids=None, filtros=None):
+    """Lê do banco, em lotes, os cursos selecionados ou que atendem aos filtros
+
+    Retorna (cursos, estatísticas). Na exportação por filtros as
+    estatísticas são calculadas pelo banco (GROUP BY); com ids, ficam para
+    o gerador calcular em uma passada sobre a lista (None).
+
+    Com o catálogo em memória habilitado, os cursos vêm dele (exceto na
+    busca textual, que depende do índice FTS5).
+    """
+    if catalogo_habilitado() and not (filtros or {}).get('busca'):
+        catalogo = obter_catalogo()
+        if filtros is not None:
+            cursos = catalogo.montar_cursos(catalogo.filtrar(filtros), COLUNAS_PDF)
+            return cursos, catalogo.estatisticas(filtros)
+        return catalogo.cursos_por_ids(curso_ids, COLUNAS_PDF), None
+
+    if filtros is not None:
+        query = aplicar_filtros(
+            consultar_colunas(COLUNAS_PDF), filtros, montar_expressao_dos_filtros(filtros)
+        )
+        cursos = linhas_para_dicts(
+            query.order_by(Curso.id).yield_per(TAMANHO_LOTE_EXPORTACAO), COLUNAS_PDF
+        )
+        return cursos, consultar_estatisticas(query)
+
+    # Consultar em blocos para não estourar o limite de parâmetros do SQLite
+    ids = sorted(set(curso_ids))
+    cursos = []
+    for inicio in range(0, len(ids), TAMANHO_LOTE_EXPORTACAO):
+        bloco = ids[inicio:inicio + TAMANHO_LOTE_EXPORTACAO]
+        query = consultar_colunas(COLUNAS_PDF).filter(
+            Curso.id.in_(bloco), Curso.ativo == True
+        ).order_by(Curso.id)
+        cursos.extend(linhas_para_dicts(query, COLUNAS_PDF))
+    return cursos, None
+
+
+def enviar_pdf(caminho):
+    """Envia um PDF do cache como download
+
+    O arquivo é transmitido do disco em blocos, com Content-Length, sem
+    ser carregado inteiro na memória.
+    """
+    return send_file(os.path.abspath(caminho), mimetype='application/pdf',
+                     as_attachment=True, download_name='relatorio_cursos.pdf')
+
 
 @curso_bp.route('/cursos/export/pdf', methods=['POST'])
 def exportar_pdf():
-    dados = request.get_json()
+    """Exporta cursos em PDF
+
+    Os cursos vêm de `curso_ids` ou, com "todos": true, de todos os cursos
+    que atendem a `filtros` (os mesmos da listagem: area, metodologia,
+    faixa, busca, tipo_busca), lidos do banco em lotes.
+
+    O PDF é gerado em um pool de processos direto em um arquivo do cache,
+    indexado por (seleção, design, título, versão dos dados). Com
+    "assincrono": true a resposta é 202 com o id da tarefa, a ser consultado
+    em /cursos/export/pdf/<job_id>; sem ele, a requisição aguarda o PDF.
+    """
+    dados = request.get_json() or {}
+    if not isinstance(dados, dict):
+        return jsonify({'success': False, 'error': 'O corpo deve ser um objeto JSON'}), 400
+
     curso_ids = dados.get('curso_ids', [])
     design = dados.get('design', 'design1')
     titulo = dados.get('titulo', 'Relatório de Cursos')
+    assincrono = bool(dados.get('assincrono', False))
 
-    if not curso_ids:
+    filtros = None
+    if dados.get('todos'):
+        filtros = dados.get('filtros') or {}
+        if isinstance(filtros, dict):
+            filtros = ler_filtros(filtros)
+        if not isinstance(filtros, dict) or not all(isinstance(valor, str) for valor in filtros.values()):
+            return jsonify({
+                'success': False,
+                'error': 'filtros deve ser um objeto com valores de texto'
+            }), 400
+
+    if not curso_ids and filtros is None:
         return jsonify({'success': False, 'error': 'Nenhum curso selecionado'}), 400
 
-    cursos = Curso.query.filter(Curso.id.in_(curso_ids)).all()
-    cursos_dict = [curso.to_dict() for curso in cursos]
+    if not isinstance(curso_ids, list) or not all(id_valido(curso_id) for curso_id in curso_ids):
+        return jsonify({
+            'success': False,
+            'error': 'curso_ids deve ser uma lista de ids inteiros'
+        }), 400
 
-    if design == 'design1':
-        buffer = criar_pdf_design1(cursos_dict, titulo)
-    elif design == 'design2':
-        buffer = criar_pdf_design2(cursos_dict, titulo)
-    else:
+    if design not in DESIGNS:
         return jsonify({'success': False, 'error': 'Design inválido'}), 400
 
-    return send_file(buffer, mimetype='application/pdf',
-                     as_attachment=True, download_name='relatorio_cursos.pdf')
+    pasta_cache = current_app.config['PDF_CACHE_FOLDER']
+    selecao = {'filtros': filtros} if filtros is not None else {'curso_ids': sorted(set(curso_ids))}
+    chave = chave_exportacao(selecao, design, titulo, obter_versao())
+
+    # PDF idêntico já gerado: servir direto do cache
+    caminho = obter_pdf_em_cache(pasta_cache, chave)
+    if caminho:
+        return enviar_pdf(caminho)
+
+    cursos_dict, estatisticas = carregar_cursos_para_exportacao(curso_ids, filtros)
+    if not cursos_dict:
+        return jsonify({'success': False, 'error': 'Nenhum curso encontrado'}), 400
+
+    tarefa = agendar_exportacao(current_app._get_current_object(), chave,
+                                cursos_dict, design, titulo, estatisticas)
+
+    if assincrono:
+        return jsonify({
+            'success': True,
+            'job_id': chave,
+            'status': 'processando'
+        }), 202
+
+    try:
+        return enviar_pdf(tarefa.result())
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Erro ao gerar PDF: {str(e)}'}), 500
+
 
+@curso_bp.route('/cursos/export/pdf/<job_id>', methods=['GET'])
+def consultar_exportacao_pdf(job_id):
+    """Retorna o PDF de uma exportação assíncrona ou sua situação atual"""
+    caminho = obter_pdf_em_cache(current_app.config['PDF_CACHE_FOLDER'], job_id)
+    if caminho:
+        return enviar_pdf(caminho)
 
+    exportacao = obter_exportacao(job_id)
+    if exportacao is None:
+        return jsonify({'success': False, 'error': 'Exportação não encontrada'}), 404
+
+    if exportacao.status != ERRO:
+        return jsonify({'success': True, 'job_id': job_id, 'status': 'processando'}), 202
+
+    return jsonify({
+        'success': False,
+        'job_id': job_id,
+        'status': 'erro',
+        'error': f'Erro ao gerar PDF: {exportacao.mensagem_erro}'
+    }), 500
+
+
+from flask import Response, stream_with_context
+import tempfile
+from src.exportacao_planilhas import COLUNAS_EXPORTACAO, gerar_csv, gravar_xlsx
+
+
+def consultar_linhas_exportacao(filtros):
+    """Consulta as colunas exportadas dos cursos filtrados, lidas do banco em lotes"""
+    query = aplicar_filtros(
+        consultar_colunas(COLUNAS_EXPORTACAO), filtros, montar_expressao_dos_filtros(filtros)
+    )
+    return query.order_by(Curso.id).yield_per(TAMANHO_LOTE_EXPORTACAO)
+
+
+@curso_bp.route('/cursos/export/csv', methods=['GET'])
+def exportar_csv():
+    """Exporta em CSV os cursos que atendem aos filtros da listagem
+
+    A resposta é transmitida em blocos enquanto as linhas são lidas do
+    banco, com uso de memória constante. Use separador=; para o Excel
+    em português.
+    """
+    try:
+        filtros = ler_filtros(request.args)
+        separador = request.args.get('separador', ',')
+        if separador not in (',', ';', '\t'):
+            return jsonify({
+                'success': False,
+                'error': 'Separador inválido (use , ; ou tab)'
+            }), 400
+
+        linhas = consultar_linhas_exportacao(filtros)
+        return Response(
+            stream_with_context(gerar_csv(linhas, separador)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=cursos.csv'}
+        )
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@curso_bp.route('/cursos/export/xlsx', methods=['GET'])
+def exportar_xlsx():
+    """Exporta em XLSX os cursos que atendem aos filtros da listagem
+
+    A planilha é gravada em modo write-only em um arquivo temporário
+    anônimo e transmitida do disco; o arquivo some quando é fechado ao
+    final da resposta.
+    """
+    try:
+        filtros = ler_filtros(request.args)
+
+        arquivo = tempfile.TemporaryFile(suffix='.xlsx')
+        try:
+            gravar_xlsx(consultar_linhas_exportacao(filtros), arquivo)
+            tamanho = arquivo.tell()
+            arquivo.seek(0)
+        except Exception:
+            arquivo.close()
+            raise
+
+        resposta = send_file(
+            arquivo,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            as_attachment=True,
+            download_name='cursos.xlsx'
+        )
+        resposta.content_length = tamanho
+        return resposta
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
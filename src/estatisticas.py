@@ -0,0 +1,44 @@
+from collections import Counter
+
+
+def estatisticas_de_contagens(contagens):
+    """Monta as estatísticas do relatório a partir de contagens agrupadas
+
+    `contagens` é um iterável de (area, metodologia, faixa, quantidade),
+    como o resultado de um GROUP BY nas três colunas ou um curso por vez
+    com quantidade 1. Tudo é calculado em uma única passada.
+
+    Retorna um dicionário com:
+        total: quantidade de cursos
+        areas, metodologias, faixas: Counter por valor (áreas vazias
+            ficam de fora, como nos relatórios)
+        area_metodologia: Counter por par (área, metodologia)
+    """
+    total = 0
+    areas = Counter()
+    metodologias = Counter()
+    faixas = Counter()
+    area_metodologia = Counter()
+
+    for area, metodologia, faixa, quantidade in contagens:
+        total += quantidade
+        if area:
+            areas[area] += quantidade
+            area_metodologia[(area, metodologia)] += quantidade
+        metodologias[metodologia] += quantidade
+        faixas[faixa] += quantidade
+
+    return {
+        'total': total,
+        'areas': areas,
+        'metodologias': metodologias,
+        'faixas': faixas,
+        'area_metodologia': area_metodologia
+    }
+
+
+def calcular_estatisticas(cursos):
+    """Calcula as estatísticas de uma lista de cursos (dicionários) em uma passada"""
+    return estatisticas_de_contagens(
+        (curso['area'], curso['metodologia'], curso['faixa'], 1) for curso in cursos
+    )
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+from src.banco import escrita
+from src.extensions import db
+from src.metricas import observar
+
+
+# Designs aceitos (as chaves de pdf_generator.DESIGNS). O gerador, e com
+# ele o ReportLab, só é importado nos processos do pool
+DESIGNS = ('design1', 'design2')
+
+# Pool de processos compartilhado pelas exportações deste processo
+executor = None
+trava_executor = threading.Lock()
+
+# Exportações em andamento neste processo: chave -> Future
+tarefas = {}
+trava_tarefas = threading.Lock()
+
+# Situações possíveis de uma exportação
+PROCESSANDO = 'processando'
+ERRO = 'erro'
+
+# Tempo que a situação de uma exportação (com erro ou interrompida) é mantida
+RETENCAO_EXPORTACOES = timedelta(hours=1)
+
+
+class ExportacaoPdf(db.Model):
+    """Situação de uma exportação de PDF assíncrona
+
+    Fica no banco, e não só na memória do processo que gera o PDF, para
+    que a consulta funcione em qualquer worker. Exportações concluídas são
+    removidas: a partir daí o próprio PDF no cache responde a consulta.
+    """
+
+    __tablename__ = 'exportacoes_pdf'
+
+    id = db.Column(db.String(64), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default=PROCESSANDO)
+    mensagem_erro = db.Column(db.Text, nullable=True)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ExportacaoPdf {self.id} {self.status}>'
+
+
+def obter_executor(app):
+    """Cria (uma vez por processo) o pool de processos das exportações
+
+    O ReportLab é limitado pela CPU e pelo GIL, então cada PDF é gerado em
+    um processo separado. O contexto "spawn" evita herdar conexões e
+    threads do servidor.
+    """
+    global executor
+
+    with trava_executor:
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=app.config.get('PDF_WORKERS', 2),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return executor
+
+
+def descartar_executor(pool):
+    """Descarta o pool quebrado (um processo dele morreu, ex.: falta de memória)
+
+    O próximo obter_executor cria um pool novo.
+    """
+    global executor
+
+    with trava_executor:
+        if executor is pool:
+            executor = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def submeter(app, funcao, *args):
+    """Envia a função ao pool, recriando-o uma vez se ele estiver quebrado"""
+    pool = obter_executor(app)
+    try:
+        return pool, pool.submit(funcao, *args)
+    except BrokenProcessPool:
+        descartar_executor(pool)
+        pool = obter_executor(app)
+        return pool, pool.submit(funcao, *args)
+
+
+def chave_exportacao(selecao, design, titulo, versao):
+    """Gera a chave do cache (e id da tarefa) para uma exportação
+
+    `selecao` descreve os cursos exportados (ids ordenados ou filtros) e
+    deve ser serializável em JSON.
+    """
+    conteudo = json.dumps([selecao, design, titulo, versao], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def caminho_no_cache(pasta, chave):
+    """Retorna o caminho do PDF da chave dentro da pasta de cache"""
+    return os.path.join(pasta, f'{chave}.pdf')
+
+
+def obter_pdf_em_cache(pasta, chave):
+    """Retorna o caminho do PDF já gerado (ou None)
+
+    A data de modificação é atualizada a cada acesso, servindo de ordem
+    de uso para a remoção LRU.
+    """
+    caminho = caminho_no_cache(pasta, chave)
+    try:
+        os.utime(caminho)
+    except FileNotFoundError:
+        return None
+    return caminho
+
+
+def limitar_cache(pasta, limite_bytes):
+    """Remove os PDFs usados há mais tempo até o cache caber no limite"""
+    arquivos = []
+    for entrada in os.scandir(pasta):
+        if entrada.is_file() and entrada.name.endswith('.pdf'):
+            info = entrada.stat()
+            arquivos.append((info.st_mtime, info.st_size, entrada.path))
+
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= limite_bytes:
+            break
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+
+
+def gerar_pdf_cronometrado(cursos, design, titulo, caminho, estatisticas=None):
+    """Executada no pool: gera o PDF e retorna (caminho, duração em segundos)
+
+    A duração volta junto com o resultado porque as métricas ficam no
+    processo do servidor, não nos processos do pool.
+    """
+    from src.pdf_generator import gerar_pdf_em_arquivo
+
+    inicio = time.perf_counter()
+    gerar_pdf_em_arquivo(cursos, design, titulo, caminho, estatisticas)
+    return caminho, time.perf_counter() - inicio
+
+
+def registrar_exportacao(chave):
+    """Grava a exportação como em andamento e remove as situações expiradas"""
+    with escrita():
+        ExportacaoPdf.query.filter(
+            ExportacaoPdf.criado_em < datetime.utcnow() - RETENCAO_EXPORTACOES
+        ).delete()
+        db.session.merge(ExportacaoPdf(id=chave, status=PROCESSANDO, criado_em=datetime.utcnow()))
+        db.session.commit()
+
+
+def concluir_exportacao(chave, erro=None):
+    """Remove a exportação concluída ou grava o erro dela"""
+    with escrita():
+        exportacao = db.session.get(ExportacaoPdf, chave)
+        if exportacao is not None:
+            if erro is None:
+                db.session.delete(exportacao)
+            else:
+                exportacao.status = ERRO
+                exportacao.mensagem_erro = str(erro) or erro.__class__.__name__
+        db.session.commit()
+
+
+def agendar_exportacao(app, chave, cursos, design, titulo, estatisticas=None):
+    """Agenda a geração do PDF no pool, reaproveitando tarefa já em andamento
+
+    Retorna uma Future cujo resultado é o caminho do PDF gerado. A
+    situação da exportação é gravada no banco (ver ExportacaoPdf).
+    """
+    pasta = app.config['PDF_CACHE_FOLDER']
+    limite_bytes = app.config['PDF_CACHE_MAX_BYTES']
+
+    with trava_tarefas:
+        tarefa = tarefas.get(chave)
+        if tarefa is not None:
+            return tarefa
+
+        registrar_exportacao(chave)
+        pool, tarefa_pool = submeter(
+            app, gerar_pdf_cronometrado, cursos, design, titulo,
+            caminho_no_cache(pasta, chave), estatisticas
+        )
+        tarefa = Future()
+        tarefas[chave] = tarefa
+
+    def ao_concluir(tarefa_concluida):
+        erro = tarefa_concluida.exception()
+        if isinstance(erro, BrokenProcessPool):
+            descartar_executor(pool)
+
+        # A tarefa sai da memória em qualquer caso; a situação fica no banco
+        with trava_tarefas:
+            tarefas.pop(chave, None)
+
+        if erro is not None:
+            tarefa.set_exception(erro)
+        else:
+            caminho, segundos = tarefa_concluida.result()
+            observar('pdf_geracao_segundos', segundos, design=design)
+            tarefa.set_result(caminho)
+
+        with app.app_context():
+            concluir_exportacao(chave, erro)
+        if erro is None:
+            limitar_cache(pasta, limite_bytes)
+
+    tarefa_pool.add_done_callback(ao_concluir)
+    return tarefa
+
+
+def obter_exportacao(chave):
+    """Retorna a situação gravada da exportação (ou None, se concluída ou expirada)"""
+    return db.session.get(ExportacaoPdf, chave)
@@ -0,0 +1,53 @@
+import csv
+import io
+
+
+# Colunas exportadas, na ordem em que aparecem nos arquivos
+COLUNAS_EXPORTACAO = ('id', 'nome', 'area', 'metodologia', 'faixa', 'data_criacao')
+
+# Linhas acumuladas antes de cada bloco enviado na resposta CSV
+LINHAS_POR_BLOCO_CSV = 500
+
+
+def formatar_valor(valor):
+    """Converte datas para ISO 8601 e mantém os demais valores"""
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return valor
+
+
+def gerar_csv(linhas, separador=','):
+    """Gera o CSV em blocos de texto, a partir de um iterável de tuplas
+
+    Apenas um bloco de LINHAS_POR_BLOCO_CSV linhas fica em memória por vez.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=separador)
+    escritor.writerow(COLUNAS_EXPORTACAO)
+
+    for numero, linha in enumerate(linhas, 1):
+        escritor.writerow([formatar_valor(valor) for valor in linha])
+        if numero % LINHAS_POR_BLOCO_CSV == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def gravar_xlsx(linhas, destino):
+    """Grava as linhas em um XLSX usando o modo write-only do openpyxl
+
+    No modo write-only cada linha é serializada assim que adicionada, sem
+    manter as células em memória.
+    """
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Cursos')
+    sheet.append(COLUNAS_EXPORTACAO)
+
+    for linha in linhas:
+        sheet.append([formatar_valor(valor) for valor in linha])
+
+    workbook.save(destino)
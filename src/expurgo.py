@@ -0,0 +1,132 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from src.banco import escrita
+from src.curso import Curso
+from src.extensions import db
+from src.versao_dados import incrementar_versao
+
+
+# Intervalo entre as verificações do expurgo periódico
+INTERVALO_VERIFICACAO_SEGUNDOS = 600
+
+
+def expurgar_cursos_excluidos(retencao_dias, tamanho_lote, pausa_segundos=0, prazo=None):
+    """Remove fisicamente os cursos excluídos há mais de `retencao_dias`
+
+    Cada lote é uma transação curta com a vez de escrita (ver
+    src/banco.py), e a pausa entre lotes deixa as requisições gravarem
+    no meio do expurgo. Para ao atingir `prazo` (datetime), se informado.
+    Cursos inativos sem data de exclusão nunca são removidos.
+    Retorna a quantidade de cursos removidos.
+
+    Os cursos removidos já não aparecem em nenhuma resposta, então a
+    versão dos dados (que invalida os caches) muda uma vez só, no fim, e
+    apenas se algo foi removido.
+    """
+    limite = datetime.utcnow() - timedelta(days=retencao_dias)
+    removidos = 0
+
+    while prazo is None or datetime.now() < prazo:
+        with escrita():
+            # Coberta pelo índice parcial ix_cursos_excluidos
+            ids = [curso_id for (curso_id,) in db.session.query(Curso.id).filter(
+                Curso.ativo == False, Curso.excluido_em < limite
+            ).order_by(Curso.excluido_em).limit(tamanho_lote)]
+
+            if not ids:
+                db.session.rollback()
+                break
+
+            db.session.execute(Curso.__table__.delete().where(Curso.id.in_(ids)))
+            db.session.commit()
+
+        removidos += len(ids)
+        if len(ids) < tamanho_lote:
+            break
+        time.sleep(pausa_segundos)
+
+    if removidos:
+        with escrita():
+            incrementar_versao()
+            db.session.commit()
+    return removidos
+
+
+def compactar_banco(fracao_minima):
+    """Executa VACUUM se as páginas livres passarem de `fracao_minima`
+
+    O VACUUM reescreve o arquivo inteiro, então só compensa depois de
+    expurgos grandes. Retorna True se o banco foi compactado.
+    """
+    with db.engine.connect() as conexao:
+        paginas = conexao.exec_driver_sql('PRAGMA page_count').scalar()
+        livres = conexao.exec_driver_sql('PRAGMA freelist_count').scalar()
+    if not paginas or livres / paginas < fracao_minima:
+        return False
+
+    with escrita():
+        # VACUUM não pode rodar dentro de uma transação
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conexao:
+            conexao.exec_driver_sql('VACUUM')
+            conexao.exec_driver_sql('PRAGMA optimize')
+    return True
+
+
+def em_horario_de_expurgo(agora, horario):
+    """Indica se a hora de `agora` está na janela (início, fim), em horas
+
+    A janela pode passar da meia-noite, por exemplo (22, 4).
+    """
+    inicio, fim = horario
+    if inicio <= fim:
+        return inicio <= agora.hour < fim
+    return agora.hour >= inicio or agora.hour < fim
+
+
+def fim_do_horario(agora, horario):
+    """Retorna o fim da janela de expurgo que contém `agora`"""
+    fim = agora.replace(hour=horario[1], minute=0, second=0, microsecond=0)
+    return fim if fim > agora else fim + timedelta(days=1)
+
+
+def executar_expurgo(config, prazo=None):
+    """Expurga os cursos excluídos e compacta o banco, conforme a configuração
+
+    Deve rodar dentro do contexto da aplicação.
+    """
+    removidos = expurgar_cursos_excluidos(
+        config['EXPURGO_RETENCAO_DIAS'],
+        config['EXPURGO_TAMANHO_LOTE'],
+        config['EXPURGO_PAUSA_SEGUNDOS'],
+        prazo
+    )
+    compactado = compactar_banco(config['EXPURGO_FRACAO_VACUUM']) if removidos else False
+    return {'removidos': removidos, 'compactado': compactado}
+
+
+def iniciar_expurgo_periodico(app):
+    """Inicia uma thread que executa o expurgo uma vez por dia, na janela EXPURGO_HORARIO
+
+    Com vários workers, ative EXPURGO_AUTOMATICO em apenas um processo ou
+    agende `flask --app app expurgar-cursos` no cron.
+    """
+    def executar_periodicamente():
+        ultimo_dia = None
+        while True:
+            agora = datetime.now()
+            horario = app.config['EXPURGO_HORARIO']
+            if agora.date() != ultimo_dia and em_horario_de_expurgo(agora, horario):
+                ultimo_dia = agora.date()
+                try:
+                    with app.app_context():
+                        resultado = executar_expurgo(app.config, fim_do_horario(agora, horario))
+                    print(f"Expurgo: {resultado['removidos']} curso(s) removido(s)")
+                except Exception as e:
+                    print(f"Erro no expurgo de cursos: {e}")
+            time.sleep(INTERVALO_VERIFICACAO_SEGUNDOS)
+
+    thread = threading.Thread(target=executar_periodicamente, name='expurgo', daemon=True)
+    thread.start()
+    return thread
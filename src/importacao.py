@@ -0,0 +1,514 @@
+from datetime import datetime
+from itertools import chain
+
+from sqlalchemy import bindparam, text
+
+from src.banco import escrita
+from src.curso import Curso
+from src.extensions import db
+from src.metricas import cronometrar
+from src.versao_dados import incrementar_versao
+
+
+# Quantidade de cursos enviados ao banco por vez durante a importação
+TAMANHO_LOTE = 1000
+
+# Quantidade máxima de cursos listados em `detalhes` na resposta
+LIMITE_DETALHES = 1000
+
+# Quantidade máxima de mensagens de erro guardadas (as demais são só contadas)
+LIMITE_ERROS = 1000
+
+# Valores que indicam que a primeira linha da planilha é um cabeçalho
+CABECALHOS = ['nome', 'curso', 'área', 'metodologia', 'faixa']
+
+
+def ler_linhas_planilha(origem):
+    """Lê a planilha em modo streaming, gerando (número da linha, valores)
+
+    `origem` pode ser um caminho ou um arquivo aberto (ex.: o stream do
+    upload). O modo read_only do openpyxl lê as linhas sob demanda, sem
+    carregar a planilha inteira na memória.
+    """
+    # Importado só na primeira planilha, para não pesar no início dos workers
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(origem, read_only=True)
+    try:
+        sheet = workbook.active
+        linhas = sheet.iter_rows(values_only=True)
+
+        # Verificar se a primeira linha contém cabeçalhos
+        primeira_linha = next(linhas, None)
+        if primeira_linha is None:
+            return
+
+        tem_cabecalho = any(str(cell).lower() in CABECALHOS
+                            for cell in primeira_linha if cell)
+        if not tem_cabecalho:
+            linhas = chain([primeira_linha], linhas)
+
+        # A numeração segue a usada nas mensagens de erro desde sempre
+        for linha_atual, linha in enumerate(linhas, start=2):
+            # Linhas curtas vêm sem as colunas vazias do final
+            if len(linha) < 4:
+                linha = tuple(linha) + (None,) * (4 - len(linha))
+            yield linha_atual, linha
+    finally:
+        workbook.close()
+
+
+class ErrosImportacao:
+    """Erros por linha de uma importação
+
+    Todos os erros são contados, mas só as primeiras `limite` mensagens são
+    guardadas: uma planilha cheia de erros não aumenta a memória usada nem
+    o tamanho da resposta.
+    """
+
+    def __init__(self, limite=LIMITE_ERROS):
+        self.limite = limite
+        self.mensagens = []
+        self.total = 0
+
+    def registrar(self, linha, mensagem):
+        self.total += 1
+        if len(self.mensagens) < self.limite:
+            self.mensagens.append(f'Linha {linha}: {mensagem}')
+
+    @property
+    def truncados(self):
+        return self.total > len(self.mensagens)
+
+
+def extrair_curso(linha):
+    """Extrai e valida os dados de uma linha (ordem: Nome, Área, Metodologia, Faixa)
+
+    Lança ValueError com a mensagem de erro quando falta um campo obrigatório.
+    """
+    nome = str(linha[0]).strip() if linha[0] else ''
+    area = str(linha[1]).strip() if linha[1] else ''
+    metodologia = str(linha[2]).strip() if linha[2] else ''
+    faixa = str(linha[3]).strip() if linha[3] else ''
+
+    # Validar campos obrigatórios
+    if not nome:
+        raise ValueError('Nome do curso é obrigatório')
+
+    if not metodologia:
+        raise ValueError('Metodologia é obrigatória')
+
+    if not faixa:
+        raise ValueError('Faixa é obrigatória')
+
+    return {
+        'nome': nome,
+        'area': area,
+        'metodologia': metodologia,
+        'faixa': faixa
+    }
+
+
+def ler_linha(linha_atual, linha):
+    """Valida uma linha da planilha, retornando (linha, curso, erro)"""
+    try:
+        return linha_atual, extrair_curso(linha), None
+    except ValueError as e:
+        return linha_atual, None, str(e)
+    except Exception as e:
+        return linha_atual, None, f'Erro ao processar - {str(e)}'
+
+
+def consultar_nomes_existentes(nomes):
+    """Retorna quais dos nomes já pertencem a cursos ativos
+
+    Uma consulta por lote (coberta pelo índice em nome/ativo) no lugar da
+    verificação linha a linha ou de carregar todos os nomes do banco.
+    """
+    if not nomes:
+        return set()
+    return {nome for (nome,) in db.session.query(Curso.nome).filter(
+        Curso.ativo == True, Curso.nome.in_(nomes)
+    )}
+
+
+def separar_lote(pendentes, nomes_anteriores, nomes_existentes, erros):
+    """Separa as linhas válidas e inéditas de um lote, registrando os erros
+
+    `pendentes` são tuplas (linha, curso, erro) na ordem da planilha;
+    `nomes_anteriores` mapeia os nomes já aceitos da planilha (nos lotes
+    anteriores) para a linha em que apareceram. Retorna [(linha, curso)].
+    """
+    nomes_lote = {}
+    aceitos = []
+    for linha_atual, curso, erro in pendentes:
+        if erro:
+            erros.registrar(linha_atual, erro)
+            continue
+
+        nome = curso['nome']
+        primeira_linha = nomes_lote.get(nome) or nomes_anteriores.get(nome)
+        if primeira_linha:
+            erros.registrar(linha_atual, f'Curso "{nome}" repetido na planilha '
+                                         f'(linha {primeira_linha})')
+        elif nome in nomes_existentes:
+            erros.registrar(linha_atual, f'Curso "{nome}" já existe')
+        else:
+            nomes_lote[nome] = linha_atual
+            aceitos.append((linha_atual, curso))
+    return aceitos
+
+
+def nomes_do_lote(pendentes):
+    """Nomes distintos das linhas válidas do lote"""
+    return list({curso['nome'] for _, curso, _ in pendentes if curso})
+
+
+# Nomes já aceitos da planilha em importação, fora da memória do Python.
+# Fica em uma conexão própria, que não participa dos commits dos lotes.
+SQL_CRIAR_NOMES = """
+    CREATE TEMP TABLE IF NOT EXISTS importacao_nomes (
+        nome VARCHAR(200) PRIMARY KEY,
+        linha INTEGER NOT NULL
+    )
+"""
+SQL_CONSULTAR_NOMES = text(
+    "SELECT nome, linha FROM importacao_nomes WHERE nome IN :nomes"
+).bindparams(bindparam('nomes', expanding=True))
+SQL_GUARDAR_NOMES = text("INSERT INTO importacao_nomes (nome, linha) VALUES (:nome, :linha)")
+
+
+def inserir_lote(lote):
+    """Insere um lote de cursos com um único executemany"""
+    if lote:
+        db.session.execute(Curso.__table__.insert(), lote)
+
+
+def contar_linhas_planilha(origem):
+    """Retorna o número de linhas informado pela planilha (ou None)"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(origem, read_only=True)
+    try:
+        return workbook.active.max_row
+    finally:
+        workbook.close()
+
+
+@cronometrar('planilha_processamento_segundos', modo='insert')
+def processar_planilha_excel(origem, ao_concluir_lote=None, pular_ate=0, dry_run=False):
+    """Processa planilha Excel e adiciona cursos ao banco
+
+    A planilha é lida em streaming e tratada em lotes de TAMANHO_LOTE
+    linhas: uma consulta verifica quais nomes do lote já existem e os
+    cursos aceitos são inseridos com um único executemany. Os nomes já
+    aceitos da planilha (para rejeitar repetições) ficam em uma tabela
+    temporária e os erros guardados são limitados a LIMITE_ERROS, então o
+    uso de memória não cresce com o tamanho da planilha. Cada lote é
+    gravado em um commit próprio, com a vez de escrita só durante o lote,
+    para que outras escritas rodem entre os lotes.
+
+    Args:
+        origem: caminho ou arquivo aberto da planilha
+        ao_concluir_lote: função chamada a cada lote com o progresso
+            (linhas_processadas, cursos_adicionados, erros), sendo `erros`
+            o ErrosImportacao acumulado; se informada, é responsável por
+            gravar o lote (ex.: commit com o progresso)
+        pular_ate: ignora as linhas até este número (retomada de importação)
+        dry_run: processa tudo sem gravar nada no banco
+    """
+    total_adicionados = 0
+    cursos_adicionados = []
+    erros = ErrosImportacao()
+
+    with db.engine.connect() as conexao_nomes:
+        conexao_nomes.exec_driver_sql(SQL_CRIAR_NOMES)
+
+        def gravar_lote(pendentes, linhas_processadas):
+            nonlocal total_adicionados
+
+            nomes = nomes_do_lote(pendentes)
+            nomes_anteriores = dict(
+                conexao_nomes.execute(SQL_CONSULTAR_NOMES, {'nomes': nomes}).all()
+            ) if nomes else {}
+
+            # A vez de escrita vai da verificação dos nomes até o commit do lote
+            with escrita():
+                aceitos = separar_lote(
+                    pendentes, nomes_anteriores, consultar_nomes_existentes(nomes), erros
+                )
+                if not dry_run:
+                    inserir_lote([curso for _, curso in aceitos])
+                if ao_concluir_lote:
+                    ao_concluir_lote(linhas_processadas, total_adicionados + len(aceitos), erros)
+                elif not dry_run:
+                    if aceitos:
+                        incrementar_versao()
+                    db.session.commit()
+
+            if aceitos:
+                conexao_nomes.execute(SQL_GUARDAR_NOMES, [
+                    {'nome': curso['nome'], 'linha': linha_atual} for linha_atual, curso in aceitos
+                ])
+            total_adicionados += len(aceitos)
+            espaco = LIMITE_DETALHES - len(cursos_adicionados)
+            cursos_adicionados.extend(curso for _, curso in aceitos[:espaco])
+
+        try:
+            pendentes = []
+            linhas_no_lote = 0
+            linha_atual = pular_ate
+
+            for linha_atual, linha in ler_linhas_planilha(origem):
+                # Pular linhas já importadas em uma execução anterior
+                if linha_atual <= pular_ate:
+                    continue
+
+                # Tratar o lote a cada TAMANHO_LOTE linhas lidas
+                if linhas_no_lote == TAMANHO_LOTE:
+                    gravar_lote(pendentes, linha_atual - 1)
+                    pendentes = []
+                    linhas_no_lote = 0
+                linhas_no_lote += 1
+
+                # Pular linhas vazias
+                if any(linha):
+                    pendentes.append(ler_linha(linha_atual, linha))
+
+            gravar_lote(pendentes, linha_atual)
+
+            if dry_run:
+                db.session.rollback()
+
+        except Exception:
+            db.session.rollback()
+            raise
+
+        finally:
+            conexao_nomes.exec_driver_sql('DROP TABLE IF EXISTS temp.importacao_nomes')
+            conexao_nomes.rollback()
+
+    return {
+        'success': True,
+        'dry_run': dry_run,
+        'cursos_adicionados': total_adicionados,
+        'erros': erros.mensagens,
+        'total_erros': erros.total,
+        'erros_truncados': erros.truncados,
+        'detalhes': cursos_adicionados,
+        'detalhes_truncados': total_adicionados > len(cursos_adicionados)
+    }
+
+
+# Tabela temporária (por conexão) com o conteúdo da planilha na sincronização
+SQL_CRIAR_TEMPORARIA = """
+    CREATE TEMP TABLE importacao_planilha (
+        linha INTEGER NOT NULL,
+        nome VARCHAR(200) PRIMARY KEY,
+        area VARCHAR(100),
+        metodologia VARCHAR(50) NOT NULL,
+        faixa VARCHAR(50) NOT NULL
+    )
+"""
+
+# Cursos ativos cujo nome está na planilha com algum valor diferente
+SQL_FILTRO_ATUALIZAR = """
+    cursos.ativo = 1 AND EXISTS (
+        SELECT 1 FROM importacao_planilha p
+        WHERE p.nome = cursos.nome
+          AND (cursos.area IS NOT p.area
+               OR cursos.metodologia != p.metodologia
+               OR cursos.faixa != p.faixa)
+    )
+"""
+
+# Linhas da planilha sem curso ativo com o mesmo nome
+SQL_FILTRO_INSERIR = """
+    NOT EXISTS (
+        SELECT 1 FROM cursos
+        WHERE cursos.nome = p.nome AND cursos.ativo = 1
+    )
+"""
+
+# Cursos ativos que não aparecem na planilha
+SQL_FILTRO_DESATIVAR = """
+    cursos.ativo = 1 AND NOT EXISTS (
+        SELECT 1 FROM importacao_planilha p WHERE p.nome = cursos.nome
+    )
+"""
+
+
+def carregar_planilha_temporaria(origem):
+    """Copia as linhas válidas da planilha para a tabela temporária
+
+    Cada lote é conferido contra as linhas já copiadas (nome é a chave da
+    tabela temporária). Retorna os erros por linha (ErrosImportacao), no
+    mesmo formato da importação.
+    """
+    erros = ErrosImportacao()
+    inserir = text(
+        "INSERT INTO importacao_planilha (linha, nome, area, metodologia, faixa) "
+        "VALUES (:linha, :nome, :area, :metodologia, :faixa)"
+    )
+    consultar = text(
+        "SELECT nome, linha FROM importacao_planilha WHERE nome IN :nomes"
+    ).bindparams(bindparam('nomes', expanding=True))
+
+    def copiar_lote(pendentes):
+        nomes = nomes_do_lote(pendentes)
+        nomes_anteriores = dict(db.session.execute(consultar, {'nomes': nomes}).all()) \
+            if nomes else {}
+        aceitos = separar_lote(pendentes, nomes_anteriores, set(), erros)
+        if aceitos:
+            db.session.execute(inserir, [dict(curso, linha=linha_atual)
+                                         for linha_atual, curso in aceitos])
+
+    pendentes = []
+    for linha_atual, linha in ler_linhas_planilha(origem):
+        if not any(linha):
+            continue
+
+        pendentes.append(ler_linha(linha_atual, linha))
+        if len(pendentes) >= TAMANHO_LOTE:
+            copiar_lote(pendentes)
+            pendentes = []
+
+    copiar_lote(pendentes)
+    return erros
+
+
+def calcular_diferencas(desativar_ausentes):
+    """Calcula as contagens e uma amostra (até LIMITE_DETALHES) de cada alteração"""
+    def consultar(sql):
+        return [dict(linha._mapping) for linha in
+                db.session.execute(text(f'{sql} LIMIT {LIMITE_DETALHES}'))]
+
+    def contar(sql):
+        return db.session.execute(text(f'SELECT COUNT(*) FROM ({sql})')).scalar()
+
+    sql_inserir = (f"SELECT p.linha, p.nome, p.area, p.metodologia, p.faixa "
+                   f"FROM importacao_planilha p WHERE {SQL_FILTRO_INSERIR} ORDER BY p.linha")
+    sql_atualizar = (f"SELECT cursos.id, cursos.nome, "
+                     f"cursos.area AS area_atual, p.area, "
+                     f"cursos.metodologia AS metodologia_atual, p.metodologia, "
+                     f"cursos.faixa AS faixa_atual, p.faixa "
+                     f"FROM cursos JOIN importacao_planilha p ON p.nome = cursos.nome "
+                     f"WHERE {SQL_FILTRO_ATUALIZAR} ORDER BY p.linha")
+    sql_desativar = (f"SELECT cursos.id, cursos.nome FROM cursos "
+                     f"WHERE {SQL_FILTRO_DESATIVAR} ORDER BY cursos.id")
+
+    diferencas = {
+        'inserir': consultar(sql_inserir),
+        'atualizar': consultar(sql_atualizar),
+        'desativar': consultar(sql_desativar) if desativar_ausentes else []
+    }
+    contagens = {
+        'inserir': contar(sql_inserir),
+        'atualizar': contar(sql_atualizar),
+        'desativar': contar(sql_desativar) if desativar_ausentes else 0
+    }
+    return diferencas, contagens
+
+
+@cronometrar('planilha_processamento_segundos', modo='upsert')
+def sincronizar_planilha_excel(origem, desativar_ausentes=False, dry_run=False):
+    """Sincroniza o catálogo com a planilha (modo upsert)
+
+    A planilha é copiada para uma tabela temporária e as alterações são
+    aplicadas com três comandos SQL em uma única transação:
+    atualiza área/metodologia/faixa dos cursos com o mesmo nome, insere os
+    novos e, se pedido, desativa os cursos ativos ausentes da planilha.
+    Com dry_run, apenas as diferenças são calculadas e nada é gravado.
+
+    A leitura da planilha (a parte demorada) só grava na tabela
+    temporária, então a vez de escrita é tomada apenas para comparar e
+    aplicar as alterações.
+    """
+    try:
+        db.session.execute(text("DROP TABLE IF EXISTS temp.importacao_planilha"))
+        db.session.execute(text(SQL_CRIAR_TEMPORARIA))
+
+        erros = carregar_planilha_temporaria(origem)
+
+        with escrita():
+            return aplicar_planilha_temporaria(erros, desativar_ausentes, dry_run)
+
+    except Exception as e:
+        db.session.rollback()
+        raise e
+
+
+def aplicar_planilha_temporaria(erros, desativar_ausentes, dry_run):
+    """Compara a tabela temporária com os cursos e aplica as alterações
+
+    Parte de sincronizar_planilha_excel; deve rodar com a vez de escrita.
+    Com desativar_ausentes, uma planilha sem linhas válidas (ex.: só o
+    cabeçalho, ou colunas fora de ordem) ou com linhas recusadas não é
+    aplicada: todos os cursos, ou os das linhas recusadas, seriam
+    desativados. Nesse caso o retorno tem success False.
+    """
+    if desativar_ausentes:
+        motivo = None
+        if erros.total:
+            motivo = 'A planilha tem linhas com erro'
+        elif db.session.execute(text("SELECT 1 FROM importacao_planilha LIMIT 1")).first() is None:
+            motivo = 'A planilha não tem nenhuma linha válida'
+
+        if motivo:
+            db.session.execute(text("DROP TABLE temp.importacao_planilha"))
+            db.session.rollback()
+            return {
+                'success': False,
+                'error': f'{motivo}; nenhum curso foi desativado nem alterado',
+                'erros': erros.mensagens,
+                'total_erros': erros.total,
+                'erros_truncados': erros.truncados
+            }
+
+    diferencas, contagens = calcular_diferencas(desativar_ausentes)
+
+    if not dry_run:
+        db.session.execute(text(f"""
+            UPDATE cursos SET
+                area = (SELECT p.area FROM importacao_planilha p WHERE p.nome = cursos.nome),
+                metodologia = (SELECT p.metodologia FROM importacao_planilha p
+                               WHERE p.nome = cursos.nome),
+                faixa = (SELECT p.faixa FROM importacao_planilha p WHERE p.nome = cursos.nome)
+            WHERE {SQL_FILTRO_ATUALIZAR}
+        """))
+
+        db.session.execute(text(f"""
+            INSERT INTO cursos (nome, area, metodologia, faixa, data_criacao, ativo)
+            SELECT p.nome, p.area, p.metodologia, p.faixa, :agora, 1
+            FROM importacao_planilha p
+            WHERE {SQL_FILTRO_INSERIR}
+            ORDER BY p.linha
+        """).bindparams(bindparam('agora', datetime.utcnow(), type_=db.DateTime)))
+
+        if desativar_ausentes:
+            db.session.execute(text(
+                f"UPDATE cursos SET ativo = 0, excluido_em = :agora "
+                f"WHERE {SQL_FILTRO_DESATIVAR}"
+            ).bindparams(bindparam('agora', datetime.utcnow(), type_=db.DateTime)))
+
+    db.session.execute(text("DROP TABLE temp.importacao_planilha"))
+
+    if dry_run or not any(contagens.values()):
+        db.session.rollback()
+    else:
+        incrementar_versao()
+        db.session.commit()
+
+    return {
+        'success': True,
+        'modo': 'upsert',
+        'dry_run': dry_run,
+        'cursos_adicionados': contagens['inserir'],
+        'cursos_atualizados': contagens['atualizar'],
+        'cursos_desativados': contagens['desativar'],
+        'erros': erros.mensagens,
+        'total_erros': erros.total,
+        'erros_truncados': erros.truncados,
+        'diferencas': diferencas
+    }
+
@@ -0,0 +1,264 @@
+import json
+import os
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from src.banco import escrita
+from src.extensions import db
+from src.importacao import LIMITE_ERROS, contar_linhas_planilha, processar_planilha_excel
+from src.versao_dados import incrementar_versao
+
+
+# Situações possíveis de uma importação
+PENDENTE = 'pendente'
+PROCESSANDO = 'processando'
+CONCLUIDO = 'concluido'
+ERRO = 'erro'
+
+# Pool de threads compartilhado pelas importações deste processo
+executor = None
+trava_executor = threading.Lock()
+
+
+class ImportacaoJob(db.Model):
+    """Importação de planilha executada em segundo plano
+
+    O progresso é gravado no banco a cada lote, na mesma transação dos
+    cursos inseridos, para que a importação possa ser consultada por
+    qualquer processo e retomada após uma reinicialização.
+    """
+
+    __tablename__ = 'importacao_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)
+    nome_arquivo = db.Column(db.String(255), nullable=False)
+    caminho_arquivo = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=PENDENTE)
+    total_linhas = db.Column(db.Integer, nullable=True)
+    linhas_processadas = db.Column(db.Integer, nullable=False, default=0)
+    cursos_adicionados = db.Column(db.Integer, nullable=False, default=0)
+    # Amostra das mensagens de erro (até LIMITE_ERROS) e o total de erros
+    erros = db.Column(db.Text, nullable=False, default='[]')
+    total_erros = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    mensagem_erro = db.Column(db.Text, nullable=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    iniciado_em = db.Column(db.DateTime, nullable=True)
+    concluido_em = db.Column(db.DateTime, nullable=True)
+
+    # Linha de onde a execução atual partiu (usada no cálculo do ETA)
+    linha_inicial_execucao = db.Column(db.Integer, nullable=False, default=0)
+
+    # Planilha sem dimensão gravada: total_linhas é estimado durante a leitura
+    total_estimado = db.Column(db.Boolean, nullable=False, default=False, server_default='0')
+
+    def estimar_segundos_restantes(self):
+        """Estima o tempo restante a partir da velocidade da execução atual"""
+        if self.status != PROCESSANDO or not self.iniciado_em or not self.total_linhas:
+            return None
+
+        linhas_lidas = self.linhas_processadas - self.linha_inicial_execucao
+        decorrido = (datetime.utcnow() - self.iniciado_em).total_seconds()
+        if linhas_lidas <= 0 or decorrido <= 0:
+            return None
+
+        restantes = max(self.total_linhas - self.linhas_processadas, 0)
+        return round(restantes / (linhas_lidas / decorrido), 1)
+
+    def to_dict(self):
+        """Converte o job para dicionário (útil para JSON)"""
+        erros = json.loads(self.erros)
+        return {
+            'id': self.id,
+            'nome_arquivo': self.nome_arquivo,
+            'status': self.status,
+            'total_linhas': self.total_linhas,
+            'total_estimado': self.total_estimado,
+            'linhas_processadas': self.linhas_processadas,
+            'cursos_adicionados': self.cursos_adicionados,
+            'erros': erros,
+            'total_erros': self.total_erros,
+            'erros_truncados': self.total_erros > len(erros),
+            'mensagem_erro': self.mensagem_erro,
+            'eta_segundos': self.estimar_segundos_restantes(),
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
+            'concluido_em': self.concluido_em.isoformat() if self.concluido_em else None
+        }
+
+    def __repr__(self):
+        return f'<ImportacaoJob {self.id} {self.status}>'
+
+
+def obter_executor(app):
+    """Cria (uma vez por processo) o pool de threads das importações"""
+    global executor
+
+    with trava_executor:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=app.config.get('IMPORTACAO_WORKERS', 1),
+                thread_name_prefix='importacao'
+            )
+        return executor
+
+
+def localizar_planilha(caminho):
+    """Retorna (início, fim), em bytes do arquivo, da maior planilha do .xlsx
+
+    Usado para estimar o total de linhas de planilhas sem dimensão gravada:
+    a posição de leitura do arquivo avança junto com as linhas lidas.
+    """
+    with zipfile.ZipFile(caminho) as arquivo_zip:
+        planilhas = [info for info in arquivo_zip.infolist()
+                     if info.filename.startswith('xl/worksheets/')
+                     and info.filename.endswith('.xml')]
+    if not planilhas:
+        return None
+    planilha = max(planilhas, key=lambda info: info.compress_size)
+    return planilha.header_offset, planilha.header_offset + planilha.compress_size
+
+
+def estimar_total_linhas(linhas_processadas, posicao, referencia, fim):
+    """Estima o total de linhas pelos bytes lidos da planilha
+
+    `referencia` é (linhas, posição) de uma leitura anterior: o custo em
+    bytes por linha é medido a partir dela, o que desconta a leitura
+    antecipada feita pelo openpyxl.
+    """
+    linhas_referencia, posicao_referencia = referencia
+    if linhas_processadas <= linhas_referencia or posicao <= posicao_referencia:
+        return None
+    bytes_por_linha = (posicao - posicao_referencia) / (linhas_processadas - linhas_referencia)
+    return linhas_processadas + round(max(fim - posicao, 0) / bytes_por_linha)
+
+
+def criar_job(arquivo, pasta_uploads):
+    """Salva o arquivo enviado e registra uma nova importação pendente"""
+    job_id = uuid.uuid4().hex
+    caminho = os.path.join(pasta_uploads, f'{job_id}.xlsx')
+    arquivo.save(caminho)
+
+    job = ImportacaoJob(
+        id=job_id,
+        nome_arquivo=arquivo.filename,
+        caminho_arquivo=caminho
+    )
+    with escrita():
+        db.session.add(job)
+        db.session.commit()
+    return job
+
+
+def enfileirar_job(app, job_id):
+    """Agenda a execução da importação no pool de threads"""
+    obter_executor(app).submit(executar_job, app, job_id)
+
+
+def executar_job(app, job_id):
+    """Executa (ou retoma) uma importação dentro do contexto da aplicação"""
+    with app.app_context():
+        job = db.session.get(ImportacaoJob, job_id)
+        if job is None or job.status in (CONCLUIDO, ERRO):
+            return
+
+        adicionados_antes = job.cursos_adicionados
+        erros_antes = json.loads(job.erros)
+        total_erros_antes = job.total_erros
+        amostra_gravada = len(erros_antes)
+        limites = referencia = None
+
+        with escrita():
+            job.status = PROCESSANDO
+            job.iniciado_em = datetime.utcnow()
+            job.linha_inicial_execucao = job.linhas_processadas
+            db.session.commit()
+
+        def gravar_progresso(linhas_processadas, cursos_adicionados, erros):
+            nonlocal amostra_gravada, referencia
+
+            # Cursos do lote e progresso são gravados no mesmo commit
+            job.linhas_processadas = linhas_processadas
+            job.cursos_adicionados = adicionados_antes + cursos_adicionados
+            job.total_erros = total_erros_antes + erros.total
+
+            # A amostra de mensagens só é regravada enquanto cresce
+            novos = erros.mensagens[:LIMITE_ERROS - len(erros_antes)]
+            if len(erros_antes) + len(novos) != amostra_gravada:
+                job.erros = json.dumps(erros_antes + novos, ensure_ascii=False)
+                amostra_gravada = len(erros_antes) + len(novos)
+
+            if referencia:
+                posicao = arquivo.tell()
+                job.total_linhas = estimar_total_linhas(
+                    linhas_processadas, posicao, referencia, limites[1]
+                )
+                if referencia[0] == 0:
+                    referencia = (linhas_processadas, posicao)
+
+            if cursos_adicionados:
+                incrementar_versao()
+            db.session.commit()
+
+        try:
+            # Planilhas sem dimensão gravada têm o total estimado a cada lote.
+            # Um arquivo que não é .xlsx falha já aqui e marca o job com erro
+            if job.total_linhas is None:
+                job.total_linhas = contar_linhas_planilha(job.caminho_arquivo)
+                job.total_estimado = job.total_linhas is None
+            if job.total_estimado:
+                limites = localizar_planilha(job.caminho_arquivo)
+                # Primeiro ponto da estimativa: o início da planilha; depois, o primeiro lote
+                referencia = (0, limites[0]) if limites else None
+
+            with open(job.caminho_arquivo, 'rb') as arquivo:
+                processar_planilha_excel(
+                    arquivo,
+                    ao_concluir_lote=gravar_progresso,
+                    pular_ate=job.linhas_processadas
+                )
+            job.status = CONCLUIDO
+            if job.total_estimado:
+                job.total_linhas = job.linhas_processadas
+                job.total_estimado = False
+        except Exception as e:
+            db.session.rollback()
+            job.status = ERRO
+            job.mensagem_erro = str(e)
+
+        with escrita():
+            job.concluido_em = datetime.utcnow()
+            db.session.commit()
+
+        # O arquivo só é necessário enquanto a importação pode ser retomada
+        if os.path.exists(job.caminho_arquivo):
+            os.remove(job.caminho_arquivo)
+
+
+def retomar_jobs_pendentes(app, em_segundo_plano=True):
+    """Reagenda importações interrompidas por uma reinicialização
+
+    Com `em_segundo_plano=False` as importações são executadas na hora,
+    uma após a outra. Retorna os ids das importações retomadas.
+    """
+    jobs = ImportacaoJob.query.filter(
+        ImportacaoJob.status.in_([PENDENTE, PROCESSANDO])
+    ).all()
+
+    retomados = []
+    for job in jobs:
+        if os.path.exists(job.caminho_arquivo):
+            retomados.append(job.id)
+        else:
+            job.status = ERRO
+            job.mensagem_erro = 'Arquivo da importação não encontrado'
+            job.concluido_em = datetime.utcnow()
+    db.session.commit()
+
+    for job_id in retomados:
+        if em_segundo_plano:
+            enfileirar_job(app, job_id)
+        else:
+            executar_job(app, job_id)
+    return retomados
@@ -0,0 +1,204 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+
+# Limites dos buckets dos histogramas
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LIMITES_COMANDOS = (1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+# Nome -> (tipo, descrição, limites dos buckets)
+DEFINICOES = {
+    'http_requisicao_segundos': (
+        'histogram', 'Duração das requisições HTTP', LIMITES_SEGUNDOS),
+    'http_requisicao_sql_comandos': (
+        'histogram', 'Comandos SQL executados por requisição', LIMITES_COMANDOS),
+    'http_requisicao_sql_segundos': (
+        'histogram', 'Tempo gasto em SQL por requisição', LIMITES_SEGUNDOS),
+    'sql_comandos_total': (
+        'counter', 'Comandos SQL executados (requisições e tarefas)', None),
+    'sql_segundos_total': (
+        'counter', 'Tempo total gasto em SQL (requisições e tarefas)', None),
+    'pdf_geracao_segundos': (
+        'histogram', 'Duração da geração de PDFs (no pool de processos)', LIMITES_SEGUNDOS),
+    'planilha_processamento_segundos': (
+        'histogram', 'Duração do processamento de planilhas Excel', LIMITES_SEGUNDOS),
+}
+
+# Se as métricas estão sendo coletadas neste processo
+ativas = False
+
+# Nome -> {rótulos (tupla de pares): Histograma ou valor do contador}
+series = {nome: {} for nome in DEFINICOES}
+trava_metricas = threading.Lock()
+
+
+class Histograma:
+    """Contagens por bucket, soma e total das observações"""
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+def observar(nome, valor, **rotulos):
+    """Registra uma observação em um histograma"""
+    if not ativas:
+        return
+
+    chave = tuple(sorted(rotulos.items()))
+    with trava_metricas:
+        histograma = series[nome].get(chave)
+        if histograma is None:
+            histograma = series[nome][chave] = Histograma(DEFINICOES[nome][2])
+        histograma.observar(valor)
+
+
+def incrementar(nome, valor=1, **rotulos):
+    """Soma `valor` a um contador"""
+    if not ativas:
+        return
+
+    chave = tuple(sorted(rotulos.items()))
+    with trava_metricas:
+        series[nome][chave] = series[nome].get(chave, 0) + valor
+
+
+def cronometrar(nome, **rotulos):
+    """Decorador que registra a duração da função no histograma `nome`"""
+    def decorador(funcao):
+        @wraps(funcao)
+        def executar(*args, **kwargs):
+            if not ativas:
+                return funcao(*args, **kwargs)
+
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                observar(nome, time.perf_counter() - inicio, **rotulos)
+        return executar
+    return decorador
+
+
+def formatar_rotulos(pares):
+    """Formata os rótulos como {nome="valor",...} (vazio se não houver)"""
+    if not pares:
+        return ''
+    itens = []
+    for nome, valor in pares:
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        itens.append(f'{nome}="{valor}"')
+    return '{' + ','.join(itens) + '}'
+
+
+def gerar_texto_prometheus():
+    """Gera todas as métricas no formato de exposição em texto do Prometheus"""
+    linhas = []
+    with trava_metricas:
+        for nome, (tipo, descricao, limites) in DEFINICOES.items():
+            linhas.append(f'# HELP {nome} {descricao}')
+            linhas.append(f'# TYPE {nome} {tipo}')
+
+            for chave, serie in sorted(series[nome].items()):
+                if tipo == 'counter':
+                    linhas.append(f'{nome}{formatar_rotulos(chave)} {serie}')
+                    continue
+
+                acumulado = 0
+                for limite, contagem in zip(limites + ('+Inf',), serie.contagens):
+                    acumulado += contagem
+                    rotulos = formatar_rotulos(chave + (('le', limite),))
+                    linhas.append(f'{nome}_bucket{rotulos} {acumulado}')
+                linhas.append(f'{nome}_sum{formatar_rotulos(chave)} {serie.soma}')
+                linhas.append(f'{nome}_count{formatar_rotulos(chave)} {serie.total}')
+
+    return '\n'.join(linhas) + '\n'
+
+
+def iniciar_requisicao():
+    """Marca o início da requisição e zera os contadores de SQL dela"""
+    g.inicio_requisicao = time.perf_counter()
+    g.sql_comandos = 0
+    g.sql_segundos = 0.0
+
+
+def finalizar_requisicao(resposta):
+    """Registra a duração e o SQL da requisição (after_request)"""
+    inicio = g.pop('inicio_requisicao', None)
+    if inicio is None:
+        return resposta
+
+    endpoint = request.endpoint or 'desconhecido'
+    observar('http_requisicao_segundos', time.perf_counter() - inicio,
+             endpoint=endpoint, metodo=request.method, status=resposta.status_code)
+    observar('http_requisicao_sql_comandos', g.sql_comandos, endpoint=endpoint)
+    observar('http_requisicao_sql_segundos', g.sql_segundos, endpoint=endpoint)
+    return resposta
+
+
+def antes_do_comando(conexao, cursor, comando, parametros, contexto, executemany):
+    """Evento before_cursor_execute: guarda o início do comando"""
+    conexao.info.setdefault('inicio_comandos', []).append(time.perf_counter())
+
+
+def depois_do_comando(conexao, cursor, comando, parametros, contexto, executemany):
+    """Evento after_cursor_execute: soma o comando aos totais e à requisição"""
+    duracao = time.perf_counter() - conexao.info['inicio_comandos'].pop()
+    incrementar('sql_comandos_total')
+    incrementar('sql_segundos_total', duracao)
+
+    if has_request_context() and 'sql_comandos' in g:
+        g.sql_comandos += 1
+        g.sql_segundos += duracao
+
+
+def erro_no_comando(contexto_excecao):
+    """Evento handle_error: descarta o início do comando que falhou"""
+    # Comandos com erro não passam por depois_do_comando
+    conexao = contexto_excecao.connection
+    if conexao is not None and conexao.info.get('inicio_comandos'):
+        conexao.info['inicio_comandos'].pop()
+
+
+def exportar_metricas():
+    """Retorna as métricas deste processo no formato texto do Prometheus"""
+    return current_app.response_class(
+        gerar_texto_prometheus(), mimetype='text/plain; version=0.0.4'
+    )
+
+
+def configurar_metricas(app, engine):
+    """Registra hooks, eventos do SQLAlchemy e a rota /api/metrics
+
+    Só é ativado com METRICAS_ATIVAS (ex.: FLASK_METRICAS_ATIVAS=true).
+    Desativado, nenhum hook é registrado e as funções de registro retornam
+    de imediato.
+
+    As métricas ficam na memória de cada processo; com vários workers do
+    Gunicorn, cada coleta em /api/metrics mostra apenas o worker que atendeu.
+    """
+    global ativas
+
+    if not app.config.get('METRICAS_ATIVAS'):
+        return
+
+    ativas = True
+    app.before_request(iniciar_requisicao)
+    app.after_request(finalizar_requisicao)
+    app.add_url_rule('/api/metrics', 'metricas', exportar_metricas)
+
+    event.listen(engine, 'before_cursor_execute', antes_do_comando)
+    event.listen(engine, 'after_cursor_execute', depois_do_comando)
+    event.listen(engine, 'handle_error', erro_no_comando)
@@ -0,0 +1,155 @@
+from datetime import datetime
+
+import re
+import sys
+
+from sqlalchemy import func, inspect
+from sqlalchemy.dialects import sqlite
+
+from src.busca import criar_indice_busca, cursos_fts
+from src.curso import Curso
+from src.extensions import db
+from src.importacao_jobs import ImportacaoJob
+
+
+# Passo do plano que lê a tabela cursos inteira ("SCAN cursos", sem índice).
+# Varreduras de um índice (USING INDEX / COVERING INDEX) e da tabela FTS
+# (SCAN cursos_fts VIRTUAL TABLE) são aceitas.
+VARREDURA_COMPLETA = re.compile(r'SCAN cursos(?!_)(?!.*INDEX)')
+
+
+def aplicar_migracoes():
+    """Atualiza um banco já existente (ex.: cursos.db) para o esquema atual
+
+    O db.create_all() não cria índices em tabelas que já existem, então
+    cada índice declarado em Curso é criado aqui se ainda não existir.
+    Pelo mesmo motivo, colunas novas são adicionadas com ALTER TABLE.
+    """
+    adicionar_colunas_novas()
+
+    for indice in Curso.__table__.indexes:
+        indice.create(db.engine, checkfirst=True)
+
+    # Atualizar estatísticas usadas pelo planejador de consultas
+    with db.engine.begin() as conexao:
+        conexao.exec_driver_sql('PRAGMA optimize')
+
+    criar_indice_busca()
+
+
+def adicionar_colunas_novas():
+    """Adiciona as colunas de Curso e ImportacaoJob que ainda não existem nas tabelas"""
+    inspetor = inspect(db.engine)
+    with db.engine.begin() as conexao:
+        for tabela in (Curso.__table__, ImportacaoJob.__table__):
+            if not inspetor.has_table(tabela.name):
+                continue
+            existentes = {coluna['name'] for coluna in inspetor.get_columns(tabela.name)}
+            for coluna in tabela.columns:
+                if coluna.name not in existentes:
+                    definicao = coluna.type.compile(dialect=db.engine.dialect)
+                    # NOT NULL só pode ser adicionado junto com um valor padrão
+                    if coluna.server_default is not None:
+                        definicao += f' NOT NULL DEFAULT {coluna.server_default.arg}'
+                    conexao.exec_driver_sql(
+                        f'ALTER TABLE {tabela.name} ADD COLUMN {coluna.name} {definicao}'
+                    )
+
+
+def consultas_das_rotas():
+    """Retorna as consultas executadas pelas rotas de cursos, montadas pelas
+    mesmas funções que as rotas usam
+    """
+    from src.busca import indice_busca_disponivel, montar_expressao_busca
+    from src.curso_routes import (
+        COLUNAS_PDF, aplicar_filtros, consultar_contagens, consultar_linhas_exportacao
+    )
+    from src.serializacao import consultar_colunas
+
+    def listagem(filtros, expressao=None):
+        return aplicar_filtros(consultar_colunas(), filtros, expressao)
+
+    area = {'area': 'Direito'}
+    metodologia = {'metodologia': 'SV40'}
+    faixa = {'faixa': 'FAIXA 1'}
+
+    consultas = {
+        'listagem': listagem({}).order_by(Curso.id).limit(51),
+        'listagem (cursor)': listagem({}).filter(Curso.id > 100).order_by(Curso.id).limit(51),
+        'listagem completa': listagem({}).order_by(Curso.id),
+        'area': listagem(area).order_by(Curso.id).limit(51),
+        'metodologia': listagem(metodologia).order_by(Curso.id).limit(51),
+        'faixa': listagem(faixa).order_by(Curso.id).limit(51),
+        'area + metodologia': listagem({**area, **metodologia}).order_by(Curso.id).limit(51),
+        'area + faixa': listagem({**area, **faixa}).order_by(Curso.id).limit(51),
+        'metodologia + faixa': listagem({**metodologia, **faixa}).order_by(Curso.id).limit(51),
+        'area + metodologia + faixa': listagem(
+            {**area, **metodologia, **faixa}
+        ).order_by(Curso.id).limit(51),
+        'total (area)': aplicar_filtros(db.session.query(func.count(Curso.id)), area),
+        'opcoes': consultar_contagens(Curso.query.filter(Curso.ativo == True)),
+        'estatisticas do PDF (area)': consultar_contagens(aplicar_filtros(Curso.query, area)),
+        'exportacao PDF (ids)': consultar_colunas(COLUNAS_PDF).filter(
+            Curso.id.in_([1, 2, 3]), Curso.ativo == True
+        ).order_by(Curso.id),
+        'exportacao (area)': consultar_linhas_exportacao(area),
+        'nomes existentes (importacao)': db.session.query(Curso.nome).filter(
+            Curso.ativo == True, Curso.nome.in_(['Direito Civil', 'Gestão Pública'])
+        ),
+        'expurgo': db.session.query(Curso.id).filter(
+            Curso.ativo == False, Curso.excluido_em < datetime(2025, 1, 1)
+        ).order_by(Curso.excluido_em).limit(500),
+    }
+
+    # Busca textual: join com o índice FTS5, ordenada por relevância
+    if indice_busca_disponivel():
+        expressao = montar_expressao_busca('gestao publica', 'curso')
+        consultas['busca'] = listagem({}, expressao).add_columns(
+            cursos_fts.c.rank
+        ).order_by(cursos_fts.c.rank, Curso.id).limit(51)
+        consultas['busca + area'] = listagem(area, expressao).add_columns(
+            cursos_fts.c.rank
+        ).order_by(cursos_fts.c.rank, Curso.id).limit(51)
+
+    return consultas
+
+
+def verificar_planos_consulta():
+    """Executa EXPLAIN QUERY PLAN em cada consulta das rotas
+
+    Retorna uma lista de (descrição, linhas do plano, usa_indice). Uma
+    consulta só é considerada indexada se nenhum passo ler a tabela
+    cursos inteira (SCAN cursos sem índice).
+    """
+    resultado = []
+    for descricao, query in consultas_das_rotas().items():
+        sql = str(query.statement.compile(
+            dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}
+        ))
+        plano = [linha[-1] for linha in
+                 db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}'))]
+        usa_indice = not any(VARREDURA_COMPLETA.match(passo) for passo in plano)
+        resultado.append((descricao, plano, usa_indice))
+    return resultado
+
+
+def consultas_sem_indice():
+    """Retorna (descrição, plano) das consultas das rotas que varrem a tabela"""
+    return [(descricao, plano) for descricao, plano, usa_indice in verificar_planos_consulta()
+            if not usa_indice]
+
+
+if __name__ == '__main__':
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        aplicar_migracoes()
+        print("Migrações aplicadas")
+
+        planos = verificar_planos_consulta()
+        for descricao, plano, usa_indice in planos:
+            situacao = 'OK' if usa_indice else 'VARREDURA'
+            print(f"[{situacao}] {descricao}: {' | '.join(plano)}")
+
+        # Código de saída 1 se alguma consulta varrer a tabela inteira
+        sys.exit(0 if all(usa_indice for _, _, usa_indice in planos) else 1)
@@ -3,19 +3,240 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.platypus import PageBreak, Image
+from reportlab.platypus import PageBreak, Image, Flowable
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from datetime import datetime
 import io
-from collections import Counter # Necessário para design2
+import os
+from src.estatisticas import calcular_estatisticas
 
 # Remova: import sys; sys.stdout.reconfigure(encoding='utf-8')
 
-def criar_pdf_design1(cursos, titulo="Relatório de Cursos"):
-    """Cria PDF com design corporativo (Design 1)"""
+# Estilos compartilhados entre as gerações, criados uma única vez
+ESTILOS = getSampleStyleSheet()
+
+COR_UNYLEYA = colors.Color(0.545, 0, 0)
+COR_MODERNA = colors.Color(0.2, 0.2, 0.8)
+
+# Design 1 (corporativo)
+TITULO_DESIGN1 = ParagraphStyle(
+    'TituloCustom',
+    parent=ESTILOS['Heading1'],
+    fontSize=24,
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    textColor=COR_UNYLEYA  # Cor Unyleya
+)
+
+SUBTITULO_DESIGN1 = ParagraphStyle(
+    'SubtituloCustom',
+    parent=ESTILOS['Heading2'],
+    fontSize=14,
+    spaceAfter=20,
+    alignment=TA_CENTER,
+    textColor=colors.grey
+)
+
+ESTATISTICAS_DESIGN1 = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), COR_UNYLEYA),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+TABELA_DESIGN1 = TableStyle([
+    # Cabeçalho
+    ('BACKGROUND', (0, 0), (-1, 0), COR_UNYLEYA),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+
+    # Dados
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+
+    # Zebra striping (um único comando para todas as linhas)
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [None, colors.lightgrey]),
+])
+
+# Design 2 (moderno)
+TITULO_DESIGN2 = ParagraphStyle(
+    'TituloPrincipal',
+    parent=ESTILOS['Title'],
+    fontSize=28,
+    spaceAfter=10,
+    alignment=TA_CENTER,
+    textColor=COR_MODERNA
+)
+
+SUBTITULO_DESIGN2 = ParagraphStyle(
+    'SubtituloModerno',
+    parent=ESTILOS['Heading2'],
+    fontSize=16,
+    spaceAfter=25,
+    alignment=TA_CENTER,
+    textColor=colors.grey
+)
+
+LINHA_DESIGN2 = TableStyle([
+    ('LINEBELOW', (0, 0), (-1, 0), 3, COR_MODERNA),
+])
+
+DASHBOARD_DESIGN2 = TableStyle([
+    # Título
+    ('SPAN', (0, 0), (-1, 0)),
+    ('BACKGROUND', (0, 0), (-1, 0), COR_MODERNA),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 14),
+
+    # Dados
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
+    ('ALIGN', (0, 1), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, colors.darkblue),
+])
+
+METODOLOGIA_DESIGN2 = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+])
+
+TABELA_DESIGN2 = TableStyle([
+    # Cabeçalho
+    ('BACKGROUND', (0, 0), (-1, 0), COR_MODERNA),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+
+    # Dados
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+
+    # Alternating colors (um único comando para todas as linhas)
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [None, colors.Color(0.95, 0.95, 1)]),
+])
+
+RODAPE_DESIGN2 = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.grey),
+])
+
+
+class TabelaPaginada(Flowable):
+    """Tabela de cursos que se divide exatamente no espaço livre de cada página
+
+    Ao ser dividida, gera uma Table com o cabeçalho e as linhas que cabem
+    no espaço que sobra no frame (na primeira página, abaixo das
+    estatísticas) e uma TabelaPaginada com o resto, que começa no topo da
+    página seguinte. Assim cada página tem uma única tabela, que o
+    ReportLab nunca precisa dividir de novo, e o custo de layout cresce
+    linearmente com o número de cursos.
+    """
+
+    def __init__(self, cabecalho, linhas, larguras, estilo, alturas=None):
+        super().__init__()
+        self.cabecalho = cabecalho
+        self.linhas = linhas
+        self.larguras = larguras
+        self.estilo = estilo
+        self.alturas = alturas
+        self.tabela = None
+
+    def criar_tabela(self, linhas):
+        tabela = Table([self.cabecalho] + linhas, colWidths=self.larguras)
+        tabela.setStyle(self.estilo)
+        return tabela
+
+    def medir(self, largura):
+        """Altura do cabeçalho e a menor altura possível de uma linha (medidas uma vez só)"""
+        if self.alturas is None:
+            amostra = self.criar_tabela([[''] * len(self.cabecalho)])
+            amostra.wrap(largura, 1e6)
+            self.alturas = tuple(amostra._rowHeights[:2])
+        return self.alturas
+
+    def wrap(self, largura, altura):
+        altura_cabecalho, altura_minima = self.medir(largura)
+        self.tabela = None
+        if altura_cabecalho + altura_minima * len(self.linhas) <= altura:
+            # Pode caber inteira (é a última parte da lista): medir de verdade
+            self.tabela = self.criar_tabela(self.linhas)
+            return self.tabela.wrap(largura, altura)
+        return sum(self.larguras), altura_cabecalho + altura_minima * len(self.linhas)
+
+    def split(self, largura, altura):
+        # Nenhuma linha é mais baixa que a mínima: no máximo estas cabem
+        altura_cabecalho, altura_minima = self.medir(largura)
+        limite = int((altura - altura_cabecalho) // altura_minima)
+        if limite < 1:
+            # Nem o cabeçalho com uma linha cabe: tudo vai para a próxima página
+            return []
+
+        tabela = self.criar_tabela(self.linhas[:limite])
+        _, altura_tabela = tabela.wrap(largura, altura)
+        quantidade = limite
+        if altura_tabela > altura:
+            # Linhas mais altas (ex.: texto quebrado): cortar pelas alturas reais
+            acumulado = tabela._rowHeights[0]
+            quantidade = 0
+            for altura_linha in tabela._rowHeights[1:]:
+                acumulado += altura_linha
+                if acumulado > altura:
+                    break
+                quantidade += 1
+            if quantidade < 1:
+                return []
+            tabela = self.criar_tabela(self.linhas[:quantidade])
+
+        partes = [tabela]
+        if quantidade < len(self.linhas):
+            partes.append(TabelaPaginada(self.cabecalho, self.linhas[quantidade:],
+                                         self.larguras, self.estilo, self.alturas))
+        return partes
+
+    def draw(self):
+        self.tabela.drawOn(self.canv, 0, 0)
+
+
+def criar_tabelas_paginadas(cabecalho, linhas, larguras, estilo):
+    """Retorna os flowables da tabela de cursos, dividida uma vez por página"""
+    if not linhas:
+        tabela = Table([cabecalho], colWidths=larguras)
+        tabela.setStyle(estilo)
+        return [tabela]
+    return [TabelaPaginada(cabecalho, linhas, larguras, estilo)]
+
+
+def criar_pdf_design1(cursos, titulo="Relatório de Cursos", destino=None, estatisticas=None):
+    """Cria PDF com design corporativo (Design 1)
+
+    Com `destino` (caminho ou arquivo) o PDF é gravado direto nele; sem
+    ele, é retornado um buffer em memória. `estatisticas` pode vir pronta
+    (ex.: calculada por SQL); senão é calculada a partir de `cursos`.
+    """
     try:
-        # Criar buffer em memória
-        buffer = io.BytesIO()
+        # Gravar no destino informado ou em um buffer em memória
+        buffer = destino if destino is not None else io.BytesIO()
         
         # Configurar documento
         doc = SimpleDocTemplate(
@@ -27,43 +248,22 @@ def criar_pdf_design1(cursos, titulo="Relatório de Cursos"):
             bottomMargin=18
         )
         
-        # Estilos
-        styles = getSampleStyleSheet()
-        
-        # Estilo personalizado para título
-        titulo_style = ParagraphStyle(
-            'TituloCustom',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.Color(0.545, 0, 0)  # Cor Unyleya
-        )
-        
-        # Estilo para subtítulo
-        subtitulo_style = ParagraphStyle(
-            'SubtituloCustom',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            textColor=colors.grey
-        )
-        
         # Elementos do PDF
         elementos = []
         
         # Cabeçalho
-        elementos.append(Paragraph("UNYLEYA", titulo_style))
-        elementos.append(Paragraph(titulo, subtitulo_style))
+        elementos.append(Paragraph("UNYLEYA", TITULO_DESIGN1))
+        elementos.append(Paragraph(titulo, SUBTITULO_DESIGN1))
         elementos.append(Paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}", 
-                                  styles['Normal']))
+                                  ESTILOS['Normal']))
         elementos.append(Spacer(1, 20))
         
         # Estatísticas
-        total_cursos = len(cursos)
-        areas_unicas = len(set(curso['area'] for curso in cursos if curso['area']))
-        metodologias_unicas = len(set(curso['metodologia'] for curso in cursos))
+        if estatisticas is None:
+            estatisticas = calcular_estatisticas(cursos)
+        total_cursos = estatisticas['total']
+        areas_unicas = len(estatisticas['areas'])
+        metodologias_unicas = len(estatisticas['metodologias'])
         
         stats_data = [
             ['Estatísticas do Relatório', ''],
@@ -73,26 +273,18 @@ def criar_pdf_design1(cursos, titulo="Relatório de Cursos"):
         ]
         
         stats_table = Table(stats_data, colWidths=[3*inch, 1*inch])
-        stats_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.545, 0, 0)),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        stats_table.setStyle(ESTATISTICAS_DESIGN1)
         
         elementos.append(stats_table)
         elementos.append(Spacer(1, 30))
         
         # Tabela de cursos
-        elementos.append(Paragraph("Lista de Cursos", styles['Heading2']))
+        elementos.append(Paragraph("Lista de Cursos", ESTILOS['Heading2']))
         elementos.append(Spacer(1, 10))
         
         # Cabeçalhos da tabela
-        dados_tabela = [['#', 'Nome do Curso', 'Área', 'Metodologia', 'Faixa']]
+        cabecalho = ['#', 'Nome do Curso', 'Área', 'Metodologia', 'Faixa']
+        dados_tabela = []
         
         # Adicionar cursos
         for i, curso in enumerate(cursos, 1):
@@ -104,56 +296,40 @@ def criar_pdf_design1(cursos, titulo="Relatório de Cursos"):
                 curso['faixa']
             ])
         
-        # Criar tabela
-        tabela = Table(dados_tabela, colWidths=[0.5*inch, 3*inch, 1.2*inch, 1*inch, 1*inch])
-        tabela.setStyle(TableStyle([
-            # Cabeçalho
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.545, 0, 0)),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Dados
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            
-            # Zebra striping
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ]))
-        
-        # Aplicar zebra striping manualmente
-        for i in range(1, len(dados_tabela)):
-            if i % 2 == 0:
-                tabela.setStyle(TableStyle([
-                    ('BACKGROUND', (0, i), (-1, i), colors.lightgrey)
-                ]))
-        
-        elementos.append(tabela)
+        # Criar uma tabela por página (ver TabelaPaginada)
+        elementos.extend(criar_tabelas_paginadas(
+            cabecalho, dados_tabela,
+            [0.5*inch, 3*inch, 1.2*inch, 1*inch, 1*inch],
+            TABELA_DESIGN1
+        ))
         
         # Rodapé
         elementos.append(Spacer(1, 30))
         elementos.append(Paragraph("Sistema de Gestão de Cursos - Unyleya", 
-                                  styles['Normal']))
+                                  ESTILOS['Normal']))
         
         # Gerar PDF
         doc.build(elementos)
         
         # Retornar buffer
+        if destino is not None:
+            return destino
         buffer.seek(0)
         return buffer
     except Exception as e:
         print(f"Erro ao gerar PDF (Design 1): {e}")
         raise # Re-lança a exceção para ser capturada na rota
 
-def criar_pdf_design2(cursos, titulo="Relatório Avançado de Cursos"):
-    """Cria PDF com design moderno (Design 2)"""
+def criar_pdf_design2(cursos, titulo="Relatório Avançado de Cursos", destino=None,
+                      estatisticas=None):
+    """Cria PDF com design moderno (Design 2)
+
+    Com `destino` (caminho ou arquivo) o PDF é gravado direto nele; sem
+    ele, é retornado um buffer em memória. `estatisticas` pode vir pronta
+    (ex.: calculada por SQL); senão é calculada a partir de `cursos`.
+    """
     try:
-        buffer = io.BytesIO()
+        buffer = destino if destino is not None else io.BytesIO()
         
         doc = SimpleDocTemplate(
             buffer,
@@ -164,53 +340,26 @@ def criar_pdf_design2(cursos, titulo="Relatório Avançado de Cursos"):
             bottomMargin=50
         )
         
-        styles = getSampleStyleSheet()
-        
-        # Estilos personalizados
-        titulo_principal = ParagraphStyle(
-            'TituloPrincipal',
-            parent=styles['Title'],
-            fontSize=28,
-            spaceAfter=10,
-            alignment=TA_CENTER,
-            textColor=colors.Color(0.2, 0.2, 0.8)
-        )
-        
-        subtitulo_moderno = ParagraphStyle(
-            'SubtituloModerno',
-            parent=styles['Heading2'],
-            fontSize=16,
-            spaceAfter=25,
-            alignment=TA_CENTER,
-            textColor=colors.grey
-        )
-        
         elementos = []
         
         # Cabeçalho moderno
-        elementos.append(Paragraph("📚 UNYLEYA ANALYTICS", titulo_principal))
-        elementos.append(Paragraph(titulo, subtitulo_moderno))
+        elementos.append(Paragraph("📚 UNYLEYA ANALYTICS", TITULO_DESIGN2))
+        elementos.append(Paragraph(titulo, SUBTITULO_DESIGN2))
         
         # Linha decorativa
         linha_data = [['', '', '', '', '']]
         linha_table = Table(linha_data, colWidths=[1*inch]*5)
-        linha_table.setStyle(TableStyle([
-            ('LINEBELOW', (0, 0), (-1, 0), 3, colors.Color(0.2, 0.2, 0.8)),
-        ]))
+        linha_table.setStyle(LINHA_DESIGN2)
         elementos.append(linha_table)
         elementos.append(Spacer(1, 20))
         
-        # Dashboard de estatísticas
-        total_cursos = len(cursos)
-        areas = [curso['area'] for curso in cursos if curso['area']]
-        metodologias = [curso['metodologia'] for curso in cursos]
-        faixas = [curso['faixa'] for curso in cursos]
-        
-        # Contar ocorrências
-        
-        contador_areas = Counter(areas)
-        contador_metodologias = Counter(metodologias)
-        contador_faixas = Counter(faixas)
+        # Dashboard de estatísticas (contagens calculadas em uma passada)
+        if estatisticas is None:
+            estatisticas = calcular_estatisticas(cursos)
+        total_cursos = estatisticas['total']
+        contador_areas = estatisticas['areas']
+        contador_metodologias = estatisticas['metodologias']
+        contador_faixas = estatisticas['faixas']
         
         # Dashboard em formato de cards
         dashboard_data = [
@@ -220,28 +369,13 @@ def criar_pdf_design2(cursos, titulo="Relatório Avançado de Cursos"):
         ]
         
         dashboard_table = Table(dashboard_data, colWidths=[2*inch, 1*inch, 2*inch, 1*inch])
-        dashboard_table.setStyle(TableStyle([
-            # Título
-            ('SPAN', (0, 0), (-1, 0)),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.2, 0.2, 0.8)),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            
-            # Dados
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-            ('ALIGN', (0, 1), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.darkblue),
-        ]))
+        dashboard_table.setStyle(DASHBOARD_DESIGN2)
         
         elementos.append(dashboard_table)
         elementos.append(Spacer(1, 30))
         
         # Análise por metodologia
-        elementos.append(Paragraph("📈 Distribuição por Metodologia", styles['Heading2']))
+        elementos.append(Paragraph("📈 Distribuição por Metodologia", ESTILOS['Heading2']))
         elementos.append(Spacer(1, 10))
         
         metodologia_data = [['Metodologia', 'Quantidade', 'Percentual']]
@@ -250,24 +384,18 @@ def criar_pdf_design2(cursos, titulo="Relatório Avançado de Cursos"):
             metodologia_data.append([metodologia, str(count), f"{percentual:.1f}%"])
         
         metodologia_table = Table(metodologia_data, colWidths=[2*inch, 1*inch, 1*inch])
-        metodologia_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
+        metodologia_table.setStyle(METODOLOGIA_DESIGN2)
         
         elementos.append(metodologia_table)
         elementos.append(PageBreak())
         
         # Lista detalhada de cursos
-        elementos.append(Paragraph("📋 Lista Completa de Cursos", styles['Heading2']))
+        elementos.append(Paragraph("📋 Lista Completa de Cursos", ESTILOS['Heading2']))
         elementos.append(Spacer(1, 15))
         
         # Tabela principal
-        cursos_data = [['ID', 'Nome do Curso', 'Área', 'Metodologia', 'Faixa']]
+        cabecalho = ['ID', 'Nome do Curso', 'Área', 'Metodologia', 'Faixa']
+        cursos_data = []
         
         for i, curso in enumerate(cursos, 1):
             nome_curso = curso['nome']
@@ -282,47 +410,48 @@ def criar_pdf_design2(cursos, titulo="Relatório Avançado de Cursos"):
                 curso['faixa']
             ])
         
-        cursos_table = Table(cursos_data, colWidths=[0.4*inch, 2.8*inch, 1.3*inch, 0.8*inch, 0.8*inch])
-        cursos_table.setStyle(TableStyle([
-            # Cabeçalho
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.2, 0.2, 0.8)),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            
-            # Dados
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            
-            # Alternating colors
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ]))
-        
-        # Aplicar cores alternadas
-        for i in range(1, len(cursos_data)):
-            if i % 2 == 0:
-                cursos_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, i), (-1, i), colors.Color(0.95, 0.95, 1))
-                ]))
-        
-        elementos.append(cursos_table)
+        elementos.extend(criar_tabelas_paginadas(
+            cabecalho, cursos_data,
+            [0.4*inch, 2.8*inch, 1.3*inch, 0.8*inch, 0.8*inch],
+            TABELA_DESIGN2
+        ))
         
         # Rodapé
         elementos.append(Spacer(1, 30))
         rodape_data = [[f"Relatório gerado em {datetime.now().strftime('%d/%m/%Y às %H:%M')} | Sistema Unyleya"]]
         rodape_table = Table(rodape_data, colWidths=[6*inch])
-        rodape_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.grey),
-        ]))
+        rodape_table.setStyle(RODAPE_DESIGN2)
         elementos.append(rodape_table)
         
         doc.build(elementos)
+        if destino is not None:
+            return destino
         buffer.seek(0)
         return buffer
     except Exception as e:
         print(f"Erro ao gerar PDF (Design 2): {e}")
-        raise # Re-lança a exceção para ser capturada na rota
\ No newline at end of file
+        raise # Re-lança a exceção para ser capturada na rota
+
+# Funções de geração disponíveis para cada design
+DESIGNS = {
+    'design1': criar_pdf_design1,
+    'design2': criar_pdf_design2,
+}
+
+
+def gerar_pdf_em_arquivo(cursos, design, titulo, caminho, estatisticas=None):
+    """Gera o PDF do design escolhido e grava em `caminho`
+
+    Executada nos processos do pool de exportação. O ReportLab grava direto
+    em um arquivo temporário, renomeado no final para que um PDF pela
+    metade nunca seja servido a partir do cache.
+    """
+    caminho_temporario = f'{caminho}.{os.getpid()}.tmp'
+    try:
+        DESIGNS[design](cursos, titulo, destino=caminho_temporario,
+                        estatisticas=estatisticas)
+        os.replace(caminho_temporario, caminho)
+    finally:
+        if os.path.exists(caminho_temporario):
+            os.remove(caminho_temporario)
+    return caminho
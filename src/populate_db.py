@@ -1,5 +1,6 @@
 from src.curso import Curso
 from src.extensions import db
+from src.versao_dados import incrementar_versao
 
 
 def criar_cursos_iniciais():
@@ -31,10 +32,12 @@ def criar_cursos_iniciais():
         db.session.add(curso)
     
     # Salvar no banco
+    incrementar_versao()
     db.session.commit()
     print(f"Criados {len(cursos_iniciais)} cursos iniciais")
 
 if __name__ == '__main__':
-    from app import app
+    from app import create_app
+    app = create_app()
     with app.app_context():
         criar_cursos_iniciais()
\ No newline at end of file
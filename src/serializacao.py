@@ -0,0 +1,56 @@
+import json
+
+from flask import current_app
+
+from src.curso import Curso, db
+
+try:
+    import orjson
+except ImportError:
+    # O orjson é opcional; sem ele a serialização usa o json da biblioteca padrão
+    orjson = None
+
+
+# Colunas de um curso, na mesma ordem e com os mesmos nomes de Curso.to_dict()
+COLUNAS_CURSO = ('id', 'nome', 'area', 'metodologia', 'faixa', 'data_criacao', 'ativo')
+
+
+def consultar_colunas(colunas=COLUNAS_CURSO):
+    """Cria uma consulta que retorna tuplas com as colunas pedidas
+
+    As linhas não passam pelo ORM (sem objetos Curso nem identity map),
+    o que torna a leitura de listas grandes bem mais barata.
+    """
+    return db.session.query(*[getattr(Curso, coluna) for coluna in colunas])
+
+
+def linhas_para_dicts(linhas, colunas=COLUNAS_CURSO):
+    """Converte tuplas de colunas em dicionários
+
+    As datas são mantidas como datetime; a conversão para ISO 8601 fica
+    a cargo do codificador JSON.
+    """
+    return [dict(zip(colunas, linha)) for linha in linhas]
+
+
+def converter_valor(valor):
+    """Converte para JSON os tipos que o json da biblioteca padrão não conhece"""
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    raise TypeError(f'Tipo não serializável em JSON: {type(valor).__name__}')
+
+
+def serializar_json(dados):
+    """Serializa os dados em JSON (bytes UTF-8), com orjson quando instalado"""
+    if orjson is not None:
+        return orjson.dumps(dados)
+    return json.dumps(
+        dados, ensure_ascii=False, separators=(',', ':'), default=converter_valor
+    ).encode('utf-8')
+
+
+def resposta_json(dados, status=200):
+    """Cria a resposta JSON usando o serializador rápido"""
+    return current_app.response_class(
+        serializar_json(dados), status=status, mimetype='application/json'
+    )
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from src.extensions import db
+
+
+class VersaoDados(db.Model):
+    """Contador de versão por tabela, incrementado a cada escrita
+
+    Permite que caches (opções de filtro, respostas HTTP) saibam se os
+    dados mudaram com uma única leitura por chave primária.
+    """
+
+    __tablename__ = 'versao_dados'
+
+    tabela = db.Column(db.String(50), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<VersaoDados {self.tabela}={self.versao}>'
+
+
+def obter_versao(tabela='cursos'):
+    """Retorna a versão atual dos dados da tabela (0 se nunca houve escrita)"""
+    versao = db.session.query(VersaoDados.versao).filter_by(tabela=tabela).scalar()
+    return versao or 0
+
+
+def obter_estado_versao(tabela='cursos'):
+    """Retorna (versão, data da última escrita) da tabela
+
+    Sem nenhuma escrita registrada retorna (0, None).
+    """
+    estado = db.session.query(
+        VersaoDados.versao, VersaoDados.atualizado_em
+    ).filter_by(tabela=tabela).first()
+    if estado is None:
+        return 0, None
+    return estado.versao, estado.atualizado_em
+
+
+def incrementar_versao(tabela='cursos'):
+    """Incrementa a versão na sessão atual
+
+    Deve ser chamada antes do commit da escrita, para que o novo número de
+    versão seja gravado na mesma transação que os dados.
+    """
+    atualizados = db.session.query(VersaoDados).filter_by(tabela=tabela).update({
+        VersaoDados.versao: VersaoDados.versao + 1,
+        VersaoDados.atualizado_em: datetime.utcnow()
+    }, synchronize_session=False)
+
+    if not atualizados:
+        db.session.add(VersaoDados(tabela=tabela, versao=1))
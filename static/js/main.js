@@ -678,6 +678,9 @@ function populateSelect(selectId, options) {
                     if (dados.erros.length > 0) {
                         mensagem += `\n⚠️ Erros encontrados:\n`;
                         dados.erros.forEach(erro => mensagem += `• ${erro}\n`);
+                        if (dados.erros_truncados) {
+                            mensagem += `... e mais ${dados.total_erros - dados.erros.length} erro(s)\n`;
+                        }
                     }
                     
                     alert(mensagem);
@@ -0,0 +1,53 @@
+import pytest
+
+from app import create_app
+from benchmarks.dados import popular_banco
+from src.cache_respostas import cache_respostas
+from src.catalogo import catalogos
+from src.curso_routes import cache_opcoes, trava_cache_opcoes
+from src.extensions import db
+
+
+@pytest.fixture
+def criar_app(tmp_path):
+    """Fábrica de aplicações com banco, uploads e cache de PDFs temporários
+
+    Os caches globais do processo são limpos a cada aplicação, já que
+    bancos diferentes podem ter o mesmo número de versão.
+    """
+    aplicacoes = []
+
+    def criar(cursos=1000, **config):
+        cache_respostas.limpar()
+        catalogos.clear()
+        with trava_cache_opcoes:
+            cache_opcoes['versao'] = None
+
+        app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'cursos.db'}",
+            'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+            'PDF_CACHE_FOLDER': str(tmp_path / 'pdf_cache'),
+            **config
+        })
+        with app.app_context():
+            popular_banco(cursos)
+        aplicacoes.append(app)
+        return app
+
+    yield criar
+
+    for app in aplicacoes:
+        with app.app_context():
+            db.engine.dispose()
+
+
+@pytest.fixture
+def app(criar_app):
+    """Aplicação com 1000 cursos sintéticos (ver benchmarks/dados.py)"""
+    return criar_app()
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
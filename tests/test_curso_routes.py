@@ -0,0 +1,111 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+from werkzeug.http import http_date
+
+from src.cache_respostas import cache_respostas
+from src.curso import Curso
+from src.extensions import db
+
+
+def test_bulk_reporta_ids_invalidos_por_item(app, cliente):
+    resposta = cliente.post('/api/cursos/bulk', json={
+        'excluir': [[1], True, 'a', 2],
+        'atualizar': [{'id': [3], 'nome': 'X'}, {'id': True, 'nome': 'X'}, 'a',
+                      {'id': 4, 'nome': 'Curso Atualizado'}],
+    })
+    assert resposta.status_code == 200
+    resultados = resposta.get_json()['resultados']
+
+    assert [item['success'] for item in resultados['excluir']] == [False, False, False, True]
+    assert [item['success'] for item in resultados['atualizar']] == [False, False, False, True]
+
+    with app.app_context():
+        # `true` não é tratado como o id 1
+        assert db.session.get(Curso, 1).ativo
+        assert not db.session.get(Curso, 2).ativo
+        assert db.session.get(Curso, 4).nome == 'Curso Atualizado'
+
+
+@pytest.mark.parametrize('corpo', [
+    {'excluir': [2 ** 70]}, {'excluir': [-2 ** 70]}, {'atualizar': [{'id': 2 ** 64, 'nome': 'X'}]},
+])
+def test_bulk_reporta_ids_fora_do_intervalo(cliente, corpo):
+    resposta = cliente.post('/api/cursos/bulk', json=corpo)
+    assert resposta.status_code == 200
+    (resultado,) = [item for lista in resposta.get_json()['resultados'].values() for item in lista]
+    assert not resultado['success']
+
+
+@pytest.mark.parametrize('corpo', [[1], 'excluir', 3])
+def test_bulk_recusa_corpo_que_nao_e_objeto(cliente, corpo):
+    resposta = cliente.post('/api/cursos/bulk', json=corpo)
+    assert resposta.status_code == 400
+    assert not resposta.get_json()['success']
+
+
+def criar(cliente, nome):
+    resposta = cliente.post('/api/cursos', json={
+        'nome': nome, 'area': 'Direito', 'metodologia': 'SV40', 'faixa': 'FAIXA 1'
+    })
+    assert resposta.status_code in (200, 201)
+
+
+def test_if_modified_since_nao_esconde_escrita_no_mesmo_segundo(cliente):
+    for i in range(20):
+        criar(cliente, f'Primeiro {i}')
+        primeira = cliente.get('/api/cursos?limit=5')
+        agora = datetime.now(timezone.utc).replace(microsecond=0)
+
+        # Last-Modified só é enviado depois que o segundo da escrita passou
+        ultima_alteracao = primeira.last_modified
+        assert ultima_alteracao is None or ultima_alteracao < agora
+        if ultima_alteracao is None:
+            continue
+
+        # Então uma escrita seguinte sempre muda o Last-Modified
+        criar(cliente, f'Segundo {i}')
+        resposta = cliente.get('/api/cursos?limit=5',
+                               headers={'If-Modified-Since': http_date(ultima_alteracao)})
+        assert resposta.status_code == 200
+
+
+def test_if_modified_since_sem_escrita_retorna_304(cliente):
+    criar(cliente, 'Curso')
+    time.sleep(1.1)
+    ultima_alteracao = cliente.get('/api/cursos?limit=5').last_modified
+    assert ultima_alteracao is not None
+
+    resposta = cliente.get('/api/cursos?limit=5',
+                           headers={'If-Modified-Since': http_date(ultima_alteracao)})
+    assert resposta.status_code == 304
+
+
+def test_curso_excluido_nao_pode_ser_atualizado(app, cliente):
+    assert cliente.delete('/api/cursos/5').status_code == 200
+
+    resposta = cliente.put('/api/cursos/5', json={'nome': 'Editado'})
+    assert resposta.status_code == 404
+
+    resposta = cliente.post('/api/cursos/bulk', json={'atualizar': [{'id': 5, 'nome': 'Editado'}]})
+    assert resposta.get_json()['resultados']['atualizar'][0]['error'] == 'Curso não encontrado'
+
+    with app.app_context():
+        assert db.session.get(Curso, 5).nome != 'Editado'
+
+
+def test_listagem_completa_igual_com_e_sem_catalogo(app, cliente):
+    consultas = ['/api/cursos?area=Sa%C3%BAde', '/api/cursos?metodologia=SV40&faixa=FAIXA%203',
+                 '/api/cursos']
+
+    respostas = {}
+    for catalogo in (False, True):
+        app.config['CATALOGO_EM_MEMORIA'] = catalogo
+        cache_respostas.limpar()
+        respostas[catalogo] = [cliente.get(url).get_json()['cursos'] for url in consultas]
+
+    for sql, memoria in zip(respostas[False], respostas[True]):
+        assert sql
+        assert [curso['id'] for curso in sql] == sorted(curso['id'] for curso in sql)
+        assert sql == memoria
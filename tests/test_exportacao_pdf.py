@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from src import exportacao_pdf
+from src.exportacao_pdf import ExportacaoPdf
+from src.extensions import db
+
+
+@pytest.fixture(autouse=True)
+def encerrar_pool():
+    """Cada teste começa sem pool de PDFs e encerra os processos que criou"""
+    yield
+    if exportacao_pdf.executor is not None:
+        exportacao_pdf.executor.shutdown(cancel_futures=True)
+        exportacao_pdf.executor = None
+    exportacao_pdf.tarefas.clear()
+
+
+def exportar(cliente, titulo, **dados):
+    return cliente.post('/api/cursos/export/pdf', json={
+        'curso_ids': [1, 2, 3], 'titulo': titulo, **dados
+    })
+
+
+def aguardar_exportacao(cliente, job_id, tentativas=200):
+    for _ in range(tentativas):
+        resposta = cliente.get(f'/api/cursos/export/pdf/{job_id}')
+        if resposta.status_code != 202:
+            return resposta
+        time.sleep(0.1)
+    raise AssertionError('exportação não terminou')
+
+
+def test_situacao_consultada_fora_da_memoria_do_processo(app, cliente):
+    job_id = exportar(cliente, 'Assíncrono', assincrono=True).get_json()['job_id']
+
+    # Simula a consulta chegando a outro worker, sem a tarefa em memória
+    exportacao_pdf.tarefas.clear()
+    resposta = aguardar_exportacao(cliente, job_id)
+    assert resposta.status_code == 200
+    assert resposta.mimetype == 'application/pdf'
+
+    with app.app_context():
+        assert db.session.get(ExportacaoPdf, job_id) is None
+
+
+def test_exportacao_com_erro_sai_da_memoria(app, cliente, monkeypatch):
+    # Uma função local não pode ser enviada ao processo do pool
+    monkeypatch.setattr(exportacao_pdf, 'gerar_pdf_cronometrado', lambda *args: None)
+
+    job_id = exportar(cliente, 'Com erro', assincrono=True).get_json()['job_id']
+    resposta = aguardar_exportacao(cliente, job_id)
+    assert resposta.status_code == 500
+    assert resposta.get_json()['status'] == 'erro'
+    assert job_id not in exportacao_pdf.tarefas
+
+
+def test_pool_recriado_depois_de_processo_morto(cliente):
+    assert exportar(cliente, 'Antes').status_code == 200
+
+    # Simula um processo do ReportLab morto pelo sistema (ex.: falta de memória)
+    pool = exportacao_pdf.executor
+    for processo in list(pool._processes.values()):
+        processo.kill()
+    for _ in range(100):
+        if pool._broken:
+            break
+        time.sleep(0.05)
+
+    assert exportar(cliente, 'Depois').status_code == 200
+    assert exportacao_pdf.executor is not pool
+
+
+@pytest.mark.parametrize('curso_ids', [[1, 'a'], [1, None], [True], [[1]], '1,2', [2 ** 70]])
+def test_ids_invalidos_retornam_400(cliente, curso_ids):
+    resposta = cliente.post('/api/cursos/export/pdf', json={'curso_ids': curso_ids})
+    assert resposta.status_code == 400
+    assert not resposta.get_json()['success']
+
+
+@pytest.mark.parametrize('corpo', [
+    {'todos': True, 'filtros': ['x']}, {'todos': True, 'filtros': 'area'},
+    {'todos': True, 'filtros': {'area': ['Direito']}}, [1],
+])
+def test_filtros_invalidos_retornam_400(cliente, corpo):
+    resposta = cliente.post('/api/cursos/export/pdf', json=corpo)
+    assert resposta.status_code == 400
+    assert not resposta.get_json()['success']
@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta
+
+from src.curso import Curso
+from src.expurgo import expurgar_cursos_excluidos
+from src.extensions import db
+from src.versao_dados import obter_versao
+
+
+def test_versao_muda_uma_vez_por_expurgo(app):
+    with app.app_context():
+        db.session.execute(
+            Curso.__table__.update().where(Curso.id <= 25)
+            .values(ativo=False, excluido_em=datetime.utcnow() - timedelta(days=60))
+        )
+        db.session.commit()
+        versao = obter_versao()
+
+        # 25 cursos em lotes de 10: três lotes, uma mudança de versão
+        assert expurgar_cursos_excluidos(30, 10) == 25
+        assert obter_versao() == versao + 1
+        assert db.session.query(Curso).count() == 975
+
+        # Nada a remover: a versão (e os caches) continuam valendo
+        assert expurgar_cursos_excluidos(30, 10) == 0
+        assert obter_versao() == versao + 1
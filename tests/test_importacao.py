@@ -0,0 +1,190 @@
+import io
+import multiprocessing
+import resource
+import sys
+import threading
+import time
+
+import openpyxl
+import pytest
+
+from benchmarks.dados import gerar_curso, popular_banco
+from src.curso import Curso
+from src.extensions import db
+from src.importacao import LIMITE_ERROS, processar_planilha_excel
+
+
+def montar_planilha(linhas):
+    """Planilha de importação (em memória) com as linhas informadas"""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(['Curso', 'Área', 'Metodologia', 'Faixa'])
+    for linha in linhas:
+        sheet.append(linha)
+    destino = io.BytesIO()
+    workbook.save(destino)
+    destino.seek(0)
+    return destino
+
+
+def linha_sintetica(i):
+    curso = gerar_curso(i)
+    return [curso['nome'], curso['area'], curso['metodologia'], curso['faixa']]
+
+
+def test_erros_por_linha_em_ordem(app):
+    planilha = montar_planilha([
+        ['Curso Novo', 'Direito', 'SV40', 'FAIXA 1'],
+        linha_sintetica(1),                          # já existe no banco
+        ['', 'Direito', 'SV40', 'FAIXA 1'],           # sem nome
+        ['Curso Novo', 'Direito', 'SV40', 'FAIXA 2'],  # repetido na planilha
+    ])
+    with app.app_context():
+        resultado = processar_planilha_excel(planilha)
+        assert resultado['cursos_adicionados'] == 1
+        assert resultado['erros'] == [
+            f'Linha 3: Curso "{linha_sintetica(1)[0]}" já existe',
+            'Linha 4: Nome do curso é obrigatório',
+            'Linha 5: Curso "Curso Novo" repetido na planilha (linha 2)',
+        ]
+        assert Curso.query.filter_by(nome='Curso Novo').count() == 1
+
+
+def test_repeticao_entre_lotes(app, monkeypatch):
+    monkeypatch.setattr('src.importacao.TAMANHO_LOTE', 2)
+    planilha = montar_planilha([['A', '', 'SV40', 'F'], ['B', '', 'SV40', 'F'],
+                                ['C', '', 'SV40', 'F'], ['A', '', 'SV40', 'F']])
+    with app.app_context():
+        resultado = processar_planilha_excel(planilha, dry_run=True)
+        assert resultado['cursos_adicionados'] == 3
+        assert resultado['erros'] == ['Linha 5: Curso "A" repetido na planilha (linha 2)']
+        # dry_run não grava nada
+        assert Curso.query.filter(Curso.nome.in_(['A', 'B', 'C'])).count() == 0
+
+
+def test_erros_guardados_sao_limitados(app):
+    planilha = montar_planilha([['', 'Direito', 'SV40', 'FAIXA 1']] * (LIMITE_ERROS + 50))
+    with app.app_context():
+        resultado = processar_planilha_excel(planilha, dry_run=True)
+    assert resultado['total_erros'] == LIMITE_ERROS + 50
+    assert len(resultado['erros']) == LIMITE_ERROS
+    assert resultado['erros_truncados']
+
+
+def test_escritas_rodam_entre_os_lotes_da_importacao(app):
+    linhas = 20_000
+    planilha = montar_planilha(linha_sintetica(10_000 + i) for i in range(linhas))
+    falhas = []
+
+    def importar():
+        resposta = app.test_client().post(
+            '/api/cursos/upload', data={'arquivo': (planilha, 'cursos.xlsx')}
+        )
+        if resposta.status_code != 200:
+            falhas.append(resposta.get_json())
+
+    importacao = threading.Thread(target=importar)
+    importacao.start()
+
+    # Esperar o primeiro lote ser gravado (cada lote tem seu commit)
+    with app.app_context():
+        while importacao.is_alive() and db.session.query(Curso).count() == 1000:
+            db.session.rollback()
+            time.sleep(0.01)
+
+    cliente = app.test_client()
+    escritas_durante = 0
+    for i in range(20):
+        resposta = cliente.post('/api/cursos', json={
+            'nome': f'Concorrente {i}', 'area': 'Direito', 'metodologia': 'SV40',
+            'faixa': 'FAIXA 1'
+        })
+        assert resposta.status_code == 201
+        assert cliente.get('/api/cursos?limit=5').status_code == 200
+        escritas_durante += importacao.is_alive()
+
+    importacao.join()
+    assert falhas == []
+    # As escritas não esperaram a importação inteira terminar
+    assert escritas_durante > 0
+    with app.app_context():
+        assert db.session.query(Curso).count() == 1000 + linhas + 20
+
+
+# Crescimento aceito do pico de memória (RSS) ao importar 200 mil linhas
+ORCAMENTO_MEMORIA_MB = 30
+
+
+def medir_importacao(caminho_planilha, pasta, fila):
+    """Executada em um processo novo: importa a planilha e mede o pico de memória"""
+    from app import create_app
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{pasta}/cursos.db',
+        'UPLOAD_FOLDER': f'{pasta}/uploads',
+        'PDF_CACHE_FOLDER': f'{pasta}/pdf_cache',
+        # Cache de páginas pequeno e sem mmap: o RSS mede a memória do Python
+        'SQLITE_PRAGMAS': {'journal_mode': 'WAL', 'cache_size': -2000, 'mmap_size': 0},
+    })
+    with app.app_context():
+        popular_banco(100)
+        antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        resultado = processar_planilha_excel(caminho_planilha)
+        depois = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        total = db.session.query(Curso).count()
+
+    del resultado['detalhes']
+    fila.put(((depois - antes) / 1024, resultado, total))
+
+
+@pytest.mark.skipif(sys.platform != 'linux', reason='ru_maxrss em KB só no Linux')
+def test_memoria_constante_em_planilha_grande(tmp_path):
+    # Metade das linhas repete nomes da outra metade: 100 mil cursos novos
+    # e 100 mil erros de repetição
+    linhas = 200_000
+    metade = linhas // 2
+    caminho = tmp_path / 'planilha.xlsx'
+    caminho.write_bytes(montar_planilha(
+        linha_sintetica(10_000 + i % metade) for i in range(linhas)
+    ).getvalue())
+
+    # Um processo novo, para o pico de memória não incluir o dos outros testes
+    contexto = multiprocessing.get_context('spawn')
+    fila = contexto.Queue()
+    processo = contexto.Process(target=medir_importacao, args=(str(caminho), str(tmp_path), fila))
+    processo.start()
+    crescimento_mb, resultado, total = fila.get(timeout=600)
+    processo.join()
+
+    assert resultado['cursos_adicionados'] == metade
+    assert resultado['total_erros'] == metade
+    assert len(resultado['erros']) == LIMITE_ERROS
+    assert total == 100 + metade
+    assert crescimento_mb < ORCAMENTO_MEMORIA_MB, f'pico cresceu {crescimento_mb:.1f}MB'
+
+
+@pytest.mark.parametrize('linhas', [
+    [],                                                # só o cabeçalho
+    [['SV40', 'Direito', '', 'FAIXA 1']] * 3,          # colunas fora de ordem
+    [linha_sintetica(1), ['', 'Direito', 'SV40', 'FAIXA 1']],  # uma linha recusada
+])
+def test_upsert_nao_desativa_com_planilha_vazia_ou_com_erros(app, cliente, linhas):
+    resposta = cliente.post('/api/cursos/upload?mode=upsert&desativar_ausentes=1', data={
+        'arquivo': (montar_planilha(linhas), 'cursos.xlsx')
+    })
+    assert resposta.status_code == 400
+    assert not resposta.get_json()['success']
+
+    with app.app_context():
+        assert Curso.query.filter(Curso.ativo == True).count() == 950
+
+
+def test_upsert_desativa_ausentes_com_planilha_valida(app, cliente):
+    resposta = cliente.post('/api/cursos/upload?mode=upsert&desativar_ausentes=1', data={
+        'arquivo': (montar_planilha([linha_sintetica(1), linha_sintetica(2)]), 'cursos.xlsx')
+    })
+    assert resposta.status_code == 200
+    assert resposta.get_json()['cursos_desativados'] == 948
+
+    with app.app_context():
+        assert Curso.query.filter(Curso.ativo == True).count() == 2
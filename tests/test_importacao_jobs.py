@@ -0,0 +1,101 @@
+import io
+import json
+import re
+import zipfile
+
+from src.extensions import db
+from src.importacao import LIMITE_ERROS
+from src.importacao_jobs import ImportacaoJob, executar_job
+from tests.test_importacao import linha_sintetica, montar_planilha
+
+
+def salvar_planilha(caminho, linhas, com_dimensao=True):
+    """Grava a planilha em disco, opcionalmente sem o registro <dimension>"""
+    with zipfile.ZipFile(montar_planilha(linhas)) as origem, \
+            zipfile.ZipFile(caminho, 'w', zipfile.ZIP_DEFLATED) as destino:
+        for info in origem.infolist():
+            conteudo = origem.read(info.filename)
+            if not com_dimensao and info.filename.startswith('xl/worksheets/'):
+                conteudo = re.sub(rb'<dimension [^>]*/>', b'', conteudo)
+            destino.writestr(info.filename, conteudo)
+
+
+def registrar_job(caminho):
+    job = ImportacaoJob(id='teste', nome_arquivo='cursos.xlsx', caminho_arquivo=str(caminho))
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def test_job_guarda_contagem_e_amostra_de_erros(app, tmp_path, monkeypatch):
+    monkeypatch.setattr('src.importacao.TAMANHO_LOTE', 200)
+    caminho = tmp_path / 'erros.xlsx'
+    salvar_planilha(caminho, [['', 'Direito', 'SV40', 'FAIXA 1']] * (LIMITE_ERROS + 500))
+
+    with app.app_context():
+        job_id = registrar_job(caminho)
+        executar_job(app, job_id)
+        dados = db.session.get(ImportacaoJob, job_id).to_dict()
+
+    assert dados['status'] == 'concluido'
+    assert dados['total_erros'] == LIMITE_ERROS + 500
+    assert len(dados['erros']) == LIMITE_ERROS
+    assert dados['erros_truncados']
+
+
+def test_total_estimado_sem_dimensao(app, tmp_path, monkeypatch):
+    monkeypatch.setattr('src.importacao.TAMANHO_LOTE', 5000)
+    total = 50000
+    caminho = tmp_path / 'sem_dimensao.xlsx'
+    salvar_planilha(caminho, [linha_sintetica(i) for i in range(total, 2 * total)],
+                    com_dimensao=False)
+
+    # Total de linhas visto pelo job a cada lote
+    estimativas = []
+    original = executar_job.__globals__['processar_planilha_excel']
+
+    def processar(origem, ao_concluir_lote, **kwargs):
+        def registrar(*args):
+            ao_concluir_lote(*args)
+            estimativas.append(db.session.get(ImportacaoJob, 'teste').total_linhas)
+        return original(origem, ao_concluir_lote=registrar, **kwargs)
+
+    monkeypatch.setattr('src.importacao_jobs.processar_planilha_excel', processar)
+
+    with app.app_context():
+        job_id = registrar_job(caminho)
+        executar_job(app, job_id)
+        job = db.session.get(ImportacaoJob, job_id)
+        assert job.status == 'concluido'
+        assert not job.total_estimado
+        assert job.total_linhas == job.linhas_processadas == total + 1
+        assert json.loads(job.erros) == []
+
+    # Só a primeira estimativa sofre com a leitura antecipada do arquivo
+    assert len(estimativas) == total // 5000
+    primeira, *demais = estimativas
+    assert abs(primeira - total) <= 0.2 * total
+    assert all(abs(estimativa - total) <= 0.05 * total for estimativa in demais)
+
+
+def test_arquivo_invalido_marca_job_com_erro(app, tmp_path):
+    caminho = tmp_path / 'antiga.xls'
+    caminho.write_bytes(b'\xd0\xcf\x11\xe0 planilha do Excel 97')
+
+    with app.app_context():
+        job_id = registrar_job(caminho)
+        executar_job(app, job_id)
+        job = db.session.get(ImportacaoJob, job_id)
+        assert job.status == 'erro'
+        assert job.mensagem_erro
+    assert not caminho.exists()
+
+
+def test_upload_assincrono_recusa_arquivo_que_nao_e_xlsx(app, cliente):
+    resposta = cliente.post('/api/cursos/upload?assincrono=1', data={
+        'arquivo': (io.BytesIO(b'\xd0\xcf\x11\xe0 planilha do Excel 97'), 'cursos.xls')
+    })
+    assert resposta.status_code == 400
+
+    with app.app_context():
+        assert ImportacaoJob.query.count() == 0
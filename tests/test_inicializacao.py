@@ -0,0 +1,20 @@
+import statistics
+
+from benchmarks.bench_inicializacao import MODULOS_PESADOS, ORCAMENTO_MS, medir_uma_vez
+
+
+def test_worker_de_api_inicia_dentro_do_orcamento(app, tmp_path, monkeypatch):
+    # Os processos medidos usam o banco e as pastas temporárias do teste
+    monkeypatch.setenv('FLASK_SQLALCHEMY_DATABASE_URI', app.config['SQLALCHEMY_DATABASE_URI'])
+    monkeypatch.setenv('FLASK_UPLOAD_FOLDER', app.config['UPLOAD_FOLDER'])
+    monkeypatch.setenv('FLASK_PDF_CACHE_FOLDER', app.config['PDF_CACHE_FOLDER'])
+
+    medicoes = [medir_uma_vez() for _ in range(3)]
+
+    assert all(medicao['status'] == 200 for medicao in medicoes)
+    for etapa, orcamento in ORCAMENTO_MS.items():
+        assert statistics.median(medicao[etapa] for medicao in medicoes) <= orcamento, etapa
+
+    # Só as rotas de exportação e upload precisam do ReportLab e do openpyxl
+    for medicao in medicoes:
+        assert not set(MODULOS_PESADOS) & set(medicao['modulos'])
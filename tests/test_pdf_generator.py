@@ -0,0 +1,57 @@
+import io
+from collections import defaultdict
+
+import pytest
+
+from src import pdf_generator
+from src.pdf_generator import DESIGNS
+
+
+def cursos_sinteticos(quantidade, nome_longo=False):
+    return [{
+        'id': i,
+        'nome': ('Curso de gestão ' * (4 if nome_longo and i % 7 == 0 else 1)) + str(i),
+        'area': 'Direito',
+        'metodologia': 'SV40',
+        'faixa': 'FAIXA 1',
+    } for i in range(1, quantidade + 1)]
+
+
+def tabelas_por_pagina(monkeypatch, design, cursos):
+    """Gera o PDF e retorna {página: [linhas de cada tabela de cursos desenhada]}"""
+    paginas = defaultdict(list)
+
+    def registrar(documento, flowable):
+        if isinstance(flowable, pdf_generator.TabelaPaginada):
+            flowable = flowable.tabela
+        if isinstance(flowable, pdf_generator.Table) and \
+                flowable._cellvalues[0][1:2] == ['Nome do Curso']:
+            paginas[documento.page].append(len(flowable._cellvalues) - 1)
+
+    monkeypatch.setattr(pdf_generator.SimpleDocTemplate, 'afterFlowable', registrar,
+                        raising=False)
+    DESIGNS[design](cursos, destino=io.BytesIO())
+    return dict(paginas)
+
+
+@pytest.mark.parametrize('design', DESIGNS)
+@pytest.mark.parametrize('quantidade', [1, 300])
+def test_uma_tabela_por_pagina(monkeypatch, design, quantidade):
+    paginas = tabelas_por_pagina(monkeypatch, design, cursos_sinteticos(quantidade))
+
+    assert all(len(tabelas) == 1 for tabelas in paginas.values()), paginas
+    assert sum(tabelas[0] for tabelas in paginas.values()) == quantidade
+    # Páginas seguidas, sem página em branco no meio da lista
+    assert sorted(paginas) == list(range(min(paginas), max(paginas) + 1))
+
+
+@pytest.mark.parametrize('design', DESIGNS)
+def test_linhas_mais_altas_que_a_amostra(monkeypatch, design):
+    # Nomes longos quebram em mais de uma linha só em algumas linhas
+    cursos = cursos_sinteticos(300, nome_longo=True)
+    for curso in cursos[::7]:
+        curso['area'] = 'Área\ncom\nquebras'
+
+    paginas = tabelas_por_pagina(monkeypatch, design, cursos)
+    assert all(len(tabelas) == 1 for tabelas in paginas.values()), paginas
+    assert sum(tabelas[0] for tabelas in paginas.values()) == 300
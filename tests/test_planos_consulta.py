@@ -0,0 +1,30 @@
+import pytest
+
+from src.migracoes import consultas_das_rotas, consultas_sem_indice, verificar_planos_consulta
+
+
+def test_consultas_das_rotas_usam_indices(app):
+    with app.app_context():
+        assert consultas_sem_indice() == []
+
+
+@pytest.mark.parametrize('descricao, indice', [
+    ('listagem', 'ix_cursos_ativos'),
+    ('listagem (cursor)', 'ix_cursos_ativos'),
+    ('area', 'ix_cursos_ativos_area'),
+    ('area + metodologia + faixa', 'ix_cursos_ativos_area'),
+    ('metodologia', 'ix_cursos_ativos_metodologia'),
+    ('opcoes', 'ix_cursos_ativos_area'),
+    ('expurgo', 'ix_cursos_excluidos'),
+])
+def test_consulta_usa_indice_esperado(app, descricao, indice):
+    with app.app_context():
+        planos = {descricao: plano for descricao, plano, _ in verificar_planos_consulta()}
+    assert any(f'INDEX {indice} ' in f'{passo} ' for passo in planos[descricao])
+
+
+def test_busca_textual_usa_indice_fts(app):
+    with app.app_context():
+        assert 'busca' in consultas_das_rotas()
+        planos = {descricao: plano for descricao, plano, _ in verificar_planos_consulta()}
+    assert any(passo.startswith('SCAN cursos_fts') for passo in planos['busca'])
@@ -0,0 +1,11 @@
+"""Ponto de entrada WSGI para produção
+
+Uso: gunicorn -c gunicorn.conf.py (ou qualquer servidor WSGI com wsgi:app)
+
+Antes de iniciar os workers, prepare o banco com:
+    flask --app app inicializar-banco
+    flask --app app retomar-importacoes
+"""
+from app import create_app
+
+app = create_app()